@@ -9,6 +9,10 @@ Licensed under BSD-3-Clause.
 
 import struct
 import time
+import os
+import sys
+import errno
+import ctypes
 import socket
 import hashlib
 import selectors
@@ -28,6 +32,11 @@ PROTOCOL_VERSION = 0x51  # v5.1
 HEADER_FORMAT = ">B B I Q I"
 HEADER_SIZE = 18
 
+# Precompiled codecs: skip re-parsing the format string on every packet
+_HEADER = struct.Struct(HEADER_FORMAT)
+_CHUNK_HEADER = struct.Struct(">HH")
+_ERROR_CODE = struct.Struct(">B")
+
 # Max safe UDP payload (MTU 1500 - IP header 20 - UDP header 8 - DCF header 18)
 MAX_PAYLOAD_SIZE = 1454
 MAX_CHUNK_PAYLOAD = 1400  # Leave room for chunk metadata
@@ -37,6 +46,13 @@ DEFAULT_HEARTBEAT_INTERVAL = 2.0
 DEFAULT_WORKER_TIMEOUT = 10.0
 DEFAULT_REQUEST_TIMEOUT = 300.0  # 5 minutes for inference
 
+# Datagrams pulled per recvmmsg() call (each slot preallocates a 64KB buffer)
+RECV_BATCH_SIZE = 32
+
+# Linux socket option for NAPI busy polling (not exported by the socket module)
+SO_BUSY_POLL = getattr(socket, "SO_BUSY_POLL", 46)
+SO_INCOMING_CPU = getattr(socket, "SO_INCOMING_CPU", 49)
+
 
 class MessageType(IntEnum):
     """DCF Message Types"""
@@ -68,7 +84,7 @@ class ErrorCode(IntEnum):
 # Message Classes
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@dataclass
+@dataclass(slots=True)
 class DCFMessage:
     """
     DCF Protocol Message with 18-byte header.
@@ -84,24 +100,29 @@ class DCFMessage:
     timestamp: int
     payload: bytes
     version: int = PROTOCOL_VERSION
+    # Received datagram this message was decoded from, for unmodified forwarding
+    raw: Optional[bytes] = field(default=None, repr=False, compare=False)
 
     @staticmethod
     def current_timestamp_micros() -> int:
         """Returns current time in microseconds since epoch."""
-        return int(time.time() * 1_000_000)
+        return time.time_ns() // 1000
 
-    def serialize(self) -> bytes:
-        """Serialize message to wire format."""
-        payload_len = len(self.payload)
-        header = struct.pack(
-            HEADER_FORMAT,
+    def iovec(self) -> Tuple[bytes, bytes]:
+        """Header and payload as separate buffers for scatter-gather sends."""
+        header = _HEADER.pack(
             self.version,
             self.msg_type,
             self.sequence,
             self.timestamp,
-            payload_len
+            len(self.payload)
         )
-        return header + self.payload
+        return header, self.payload
+
+    def serialize(self) -> bytes:
+        """Serialize message to wire format."""
+        header, payload = self.iovec()
+        return header + payload
 
     @classmethod
     def deserialize(cls, data: bytes) -> Optional['DCFMessage']:
@@ -109,13 +130,13 @@ class DCFMessage:
         if len(data) < HEADER_SIZE:
             return None
         try:
-            version, msg_type, sequence, timestamp, payload_len = struct.unpack(
-                HEADER_FORMAT, data[:HEADER_SIZE]
-            )
+            version, msg_type, sequence, timestamp, payload_len = _HEADER.unpack_from(data)
             if len(data) < HEADER_SIZE + payload_len:
                 return None
-            payload = data[HEADER_SIZE:HEADER_SIZE + payload_len]
-            return cls(msg_type, sequence, timestamp, payload, version)
+            end = HEADER_SIZE + payload_len
+            payload = data[HEADER_SIZE:end]
+            raw = data if len(data) == end else None
+            return cls(msg_type, sequence, timestamp, payload, version, raw)
         except struct.error:
             return None
 
@@ -152,7 +173,7 @@ class DCFMessage:
     @classmethod
     def error(cls, sequence: int, error_code: ErrorCode, message: str = "") -> 'DCFMessage':
         """Create an error message."""
-        payload = struct.pack(">B", error_code) + message.encode('utf-8')
+        payload = _ERROR_CODE.pack(error_code) + message.encode('utf-8')
         return cls(
             msg_type=MessageType.ERROR,
             sequence=sequence,
@@ -185,7 +206,7 @@ class ChunkAssembler:
     
     total_chunks: int
     chunks: Dict[int, bytes] = field(default_factory=dict)
-    created_at: float = field(default_factory=time.time)
+    created_at: int = field(default_factory=time.monotonic_ns)
     checksum: bytes = b''
     
     def add_chunk(self, chunk_idx: int, data: bytes) -> bool:
@@ -207,7 +228,7 @@ class ChunkAssembler:
     
     def is_stale(self, timeout: float = 60.0) -> bool:
         """Check if assembly has timed out."""
-        return time.time() - self.created_at > timeout
+        return time.monotonic_ns() - self.created_at > timeout * 1_000_000_000
 
 
 def chunk_payload(data: bytes, sequence: int) -> List[DCFMessage]:
@@ -233,7 +254,7 @@ def chunk_payload(data: bytes, sequence: int) -> List[DCFMessage]:
         chunk_data = data[start:end]
         
         # Build chunk header
-        header = struct.pack(">HH", total, i) + checksum
+        header = _CHUNK_HEADER.pack(total, i) + checksum
         payload = header + chunk_data
         
         msg = DCFMessage(
@@ -249,12 +270,157 @@ def chunk_payload(data: bytes, sequence: int) -> List[DCFMessage]:
 
 def parse_chunk(msg: DCFMessage) -> Tuple[int, int, bytes, bytes]:
     """Parse chunk message. Returns (total_chunks, chunk_idx, checksum, data)."""
-    total, idx = struct.unpack(">HH", msg.payload[:4])
+    total, idx = _CHUNK_HEADER.unpack_from(msg.payload)
     checksum = msg.payload[4:20]
     data = msg.payload[20:]
     return total, idx, checksum, data
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# Batched Datagram I/O (Linux recvmmsg / sendmmsg)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _SockAddrIn(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint16),       # network byte order
+        ("sin_addr", ctypes.c_ubyte * 4),
+        ("sin_zero", ctypes.c_ubyte * 8),
+    ]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+def _load_mmsg():
+    """Resolve recvmmsg/sendmmsg from libc. Returns (None, None) if unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None, None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        recvmmsg, sendmmsg = libc.recvmmsg, libc.sendmmsg
+    except (OSError, AttributeError):
+        return None, None
+    recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint,
+                         ctypes.c_int, ctypes.c_void_p]
+    recvmmsg.restype = ctypes.c_int
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    sendmmsg.restype = ctypes.c_int
+    return recvmmsg, sendmmsg
+
+
+_recvmmsg, _sendmmsg = _load_mmsg()
+
+
+def _sockaddr_in(addr: Tuple[str, int]) -> Optional[_SockAddrIn]:
+    """Pack an IPv4 literal address. Returns None for hostnames."""
+    try:
+        packed = socket.inet_aton(addr[0])
+    except OSError:
+        return None
+    sa = _SockAddrIn()
+    sa.sin_family = socket.AF_INET
+    sa.sin_port = socket.htons(addr[1])
+    ctypes.memmove(sa.sin_addr, packed, 4)
+    return sa
+
+
+class _RecvRing:
+    """
+    Preallocated recvmmsg() vectors.
+    
+    Buffers, iovecs and address slots are built once so the receive path
+    performs no per-call ctypes allocation.
+    """
+    
+    def __init__(self, size: int = RECV_BATCH_SIZE, bufsize: int = 65536):
+        self.size = size
+        self._bufs = [ctypes.create_string_buffer(bufsize) for _ in range(size)]
+        self._iov = (_IOVec * size)()
+        self._addrs = (_SockAddrIn * size)()
+        self._msgs = (_MMsgHdr * size)()
+        
+        for i in range(size):
+            self._iov[i].iov_base = ctypes.addressof(self._bufs[i])
+            self._iov[i].iov_len = bufsize
+            hdr = self._msgs[i].msg_hdr
+            hdr.msg_name = ctypes.addressof(self._addrs[i])
+            hdr.msg_namelen = ctypes.sizeof(_SockAddrIn)
+            hdr.msg_iov = ctypes.pointer(self._iov[i])
+            hdr.msg_iovlen = 1
+
+    def recv(self, fd: int, count: int) -> List[Tuple[bytes, Tuple[str, int]]]:
+        """Receive up to count datagrams without blocking."""
+        count = min(count, self.size)
+        got = _recvmmsg(fd, self._msgs, count, socket.MSG_DONTWAIT, None)
+        if got < 0:
+            err = ctypes.get_errno()
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                return []
+            raise OSError(err, os.strerror(err))
+        
+        datagrams = []
+        for i in range(got):
+            sa = self._addrs[i]
+            data = ctypes.string_at(self._bufs[i], self._msgs[i].msg_len)
+            addr = (socket.inet_ntoa(bytes(sa.sin_addr)), socket.ntohs(sa.sin_port))
+            datagrams.append((data, addr))
+        return datagrams
+
+
+def _send_mmsg(fd: int, msgs: List[DCFMessage], sa: _SockAddrIn) -> int:
+    """
+    Send messages to one destination with sendmmsg().
+    
+    Header and payload go out as a two-entry iovec per datagram.
+    Returns the number of datagrams the kernel accepted.
+    """
+    n = len(msgs)
+    bufs = [part for msg in msgs for part in msg.iovec()]  # keeps buffers alive
+    iov = (_IOVec * (2 * n))()
+    mmsgs = (_MMsgHdr * n)()
+    
+    for j, buf in enumerate(bufs):
+        iov[j].iov_base = ctypes.cast(ctypes.c_char_p(buf), ctypes.c_void_p)
+        iov[j].iov_len = len(buf)
+    for i in range(n):
+        hdr = mmsgs[i].msg_hdr
+        hdr.msg_name = ctypes.addressof(sa)
+        hdr.msg_namelen = ctypes.sizeof(_SockAddrIn)
+        hdr.msg_iov = ctypes.pointer(iov[2 * i])
+        hdr.msg_iovlen = 2
+    
+    sent = 0
+    while sent < n:
+        start = ctypes.cast(ctypes.addressof(mmsgs) + sent * ctypes.sizeof(_MMsgHdr),
+                            ctypes.POINTER(_MMsgHdr))
+        r = _sendmmsg(fd, start, n - sent, 0)
+        if r < 0:
+            err = ctypes.get_errno()
+            if err == errno.EINTR:
+                continue
+            raise OSError(err, os.strerror(err))
+        sent += r
+    return sent
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # Event-Driven UDP Socket
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -266,14 +432,35 @@ class EventDrivenUDPSocket:
     Eliminates busy-wait polling by using OS-level event notification.
     """
     
-    def __init__(self, port: int, bind_ip: str = "0.0.0.0"):
+    def __init__(self, port: int, bind_ip: str = "0.0.0.0", busy_poll_us: int = 0,
+                 reuse_port: bool = False, incoming_cpu: Optional[int] = None):
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         
+        # SO_REUSEPORT: several processes bind the same port and the kernel
+        # spreads datagrams across them by 4-tuple hash
+        if reuse_port:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        
         # Increase buffer sizes for high throughput
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 2 * 1024 * 1024)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 2 * 1024 * 1024)
         
+        # Optional NAPI busy polling: the kernel spins on the NIC queue for up to
+        # busy_poll_us before sleeping, trading CPU for lower wakeup latency
+        if busy_poll_us > 0:
+            try:
+                self.sock.setsockopt(socket.SOL_SOCKET, SO_BUSY_POLL, busy_poll_us)
+            except OSError as e:
+                logging.warning(f"SO_BUSY_POLL unavailable ({e}), continuing without it")
+        
+        # Hint the kernel to deliver this socket's flows on the given CPU
+        if incoming_cpu is not None:
+            try:
+                self.sock.setsockopt(socket.SOL_SOCKET, SO_INCOMING_CPU, incoming_cpu)
+            except OSError as e:
+                logging.warning(f"SO_INCOMING_CPU unavailable ({e}), continuing without it")
+        
         self.sock.bind((bind_ip, port))
         self.sock.setblocking(False)
         
@@ -282,7 +469,7 @@ class EventDrivenUDPSocket:
         
         self.local_addr = self.sock.getsockname()
         self._closed = False
-        self._lock = Lock()
+        self._rx_ring = _RecvRing() if _recvmmsg is not None else None
         
         logging.info(f"UDP socket bound to {bind_ip}:{port}")
 
@@ -291,11 +478,24 @@ class EventDrivenUDPSocket:
         if self._closed:
             return False
         try:
-            with self._lock:
-                self.sock.sendto(msg.serialize(), addr)
+            # sendmsg gathers header + payload in the kernel, avoiding a
+            # userspace concatenation of the full datagram. Each UDP send is
+            # atomic in the kernel, so concurrent senders need no lock.
+            self.sock.sendmsg(msg.iovec(), (), 0, addr)
             return True
         except OSError as e:
-            logging.warning(f"Send failed to {addr}: {e}")
+            logging.warning("Send failed to %s: %s", addr, e)
+            return False
+
+    def send_raw(self, data: bytes, addr: Tuple[str, int]) -> bool:
+        """Send an already-encoded datagram as-is. Returns success status."""
+        if self._closed:
+            return False
+        try:
+            self.sock.sendto(data, addr)
+            return True
+        except OSError as e:
+            logging.warning("Send failed to %s: %s", addr, e)
             return False
 
     def send_chunked(self, msg: DCFMessage, addr: Tuple[str, int]) -> bool:
@@ -303,11 +503,26 @@ class EventDrivenUDPSocket:
         if len(msg.payload) <= MAX_PAYLOAD_SIZE:
             return self.send(msg, addr)
         
-        chunks = chunk_payload(msg.payload, msg.sequence)
-        for chunk in chunks:
-            if not self.send(chunk, addr):
-                return False
-        return True
+        return self.send_batch(chunk_payload(msg.payload, msg.sequence), addr)
+
+    def send_batch(self, msgs: List[DCFMessage], addr: Tuple[str, int]) -> bool:
+        """Send several messages to one address, using sendmmsg where available."""
+        if self._closed:
+            return False
+        
+        sa = _sockaddr_in(addr) if _sendmmsg is not None else None
+        if sa is None:
+            for msg in msgs:
+                if not self.send(msg, addr):
+                    return False
+            return True
+        
+        try:
+            _send_mmsg(self.sock.fileno(), msgs, sa)
+            return True
+        except OSError as e:
+            logging.warning("Batch send failed to %s: %s", addr, e)
+            return False
 
     def recv(self, timeout: float = 0.1) -> Optional[Tuple[DCFMessage, Tuple[str, int]]]:
         """
@@ -324,11 +539,8 @@ class EventDrivenUDPSocket:
             
         try:
             data, addr = self.sock.recvfrom(65536)
-            msg = DCFMessage.deserialize(data)
+            msg = self._decode(data, addr)
             if msg:
-                # Version check
-                if msg.version != PROTOCOL_VERSION:
-                    logging.warning(f"Version mismatch from {addr}: got 0x{msg.version:02X}, expected 0x{PROTOCOL_VERSION:02X}")
                 return msg, addr
         except BlockingIOError:
             pass
@@ -337,23 +549,63 @@ class EventDrivenUDPSocket:
                 logging.error(f"Recv error: {e}")
         return None
 
-    def recv_batch(self, max_messages: int = 100, timeout: float = 0.01) -> List[Tuple[DCFMessage, Tuple[str, int]]]:
-        """Receive multiple messages in a batch for high-throughput scenarios."""
+    def recv_batch(self, max_messages: int = RECV_BATCH_SIZE) -> List[Tuple[DCFMessage, Tuple[str, int]]]:
+        """
+        Drain pending datagrams without blocking.
+        
+        Intended for callers that already know the socket is readable (e.g.
+        via an external selector). On Linux each recvmmsg() call pulls up to
+        RECV_BATCH_SIZE datagrams; elsewhere falls back to recvfrom().
+        """
         results = []
-        deadline = time.time() + timeout
+        if self._closed:
+            return results
+        
+        if self._rx_ring is not None:
+            while len(results) < max_messages:
+                want = min(max_messages - len(results), self._rx_ring.size)
+                try:
+                    datagrams = self._rx_ring.recv(self.sock.fileno(), want)
+                except OSError as e:
+                    if not self._closed:
+                        logging.error(f"Recv error: {e}")
+                    break
+                for data, addr in datagrams:
+                    msg = self._decode(data, addr)
+                    if msg:
+                        results.append((msg, addr))
+                if len(datagrams) < want:
+                    break
+            return results
         
         while len(results) < max_messages:
-            remaining = deadline - time.time()
-            if remaining <= 0:
+            try:
+                data, addr = self.sock.recvfrom(65536)
+            except BlockingIOError:
                 break
-            result = self.recv(timeout=min(remaining, 0.001))
-            if result:
-                results.append(result)
-            else:
+            except OSError as e:
+                if not self._closed:
+                    logging.error(f"Recv error: {e}")
                 break
+            msg = self._decode(data, addr)
+            if msg:
+                results.append((msg, addr))
         
         return results
 
+    @staticmethod
+    def _decode(data: bytes, addr: Tuple[str, int]) -> Optional[DCFMessage]:
+        """Deserialize a datagram, warning on protocol version mismatch."""
+        msg = DCFMessage.deserialize(data)
+        if msg and msg.version != PROTOCOL_VERSION:
+            logging.warning("Version mismatch from %s: got 0x%02X, expected 0x%02X",
+                            addr, msg.version, PROTOCOL_VERSION)
+        return msg
+
+    def fileno(self) -> int:
+        """Underlying socket descriptor, for registration with external selectors."""
+        return self.sock.fileno()
+
     def close(self):
         """Clean shutdown."""
         self._closed = True
@@ -387,7 +639,7 @@ class NodeMetrics:
     uptime_seconds: float = 0.0
     
     _latencies: List[float] = field(default_factory=list)
-    _start_time: float = field(default_factory=time.time)
+    _start_time: int = field(default_factory=time.monotonic_ns)
     _lock: Lock = field(default_factory=Lock)
     
     def record_latency(self, latency_ms: float):
@@ -409,7 +661,7 @@ class NodeMetrics:
             "tasks_processed": self.tasks_processed,
             "tasks_failed": self.tasks_failed,
             "avg_latency_ms": round(self.avg_latency_ms, 2),
-            "uptime_seconds": round(time.time() - self._start_time, 1)
+            "uptime_seconds": round((time.monotonic_ns() - self._start_time) / 1_000_000_000, 1)
         }
 
 
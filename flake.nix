@@ -177,9 +177,11 @@
                     modelArg = if cfg.modelPath != null 
                                then "--model-path ${cfg.modelPath}"
                                else "";
+                    # The head's registry needs numpy; uvloop/orjson are optional speedups
+                    headPython = pkgs.python311.withPackages (ps: with ps; [ numpy uvloop orjson ]);
                   in
                   if cfg.role == "head" then
-                    "${pkgs.python311}/bin/python3 ${./src/head_controller.py}"
+                    "${headPython}/bin/python3 ${./src/head_controller.py}"
                   else
                     "${pkgs.python311}/bin/python3 ${./src/worker_node.py} --head-ip ${cfg.headIp} ${modelArg}";
               };
@@ -243,6 +245,8 @@
           protobuf
           sentencepiece
           gradio
+          uvloop
+          orjson
         ];
 
         pythonML_Nvidia = pkgsCuda.python311.withPackages (ps: (commonPyPkgs ps) ++ (with ps; [
@@ -9,18 +9,36 @@ Licensed under BSD-3-Clause.
 
 import time
 import signal
+import asyncio
+import heapq
 import threading
 import json
+import mmap
 import os
+import socket
+import struct
 from dataclasses import dataclass, field
-from typing import Dict, Optional, Tuple, Set
+from typing import Dict, List, Optional, Tuple, Set
 from collections import deque
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+
+try:
+    import uvloop  # Optional: libuv-backed event loop
+except ImportError:
+    uvloop = None
+
+try:
+    import orjson  # Optional: C-accelerated JSON for /metrics
+except ImportError:
+    orjson = None
+
 from dcf_common import (
     EventDrivenUDPSocket, DCFMessage, MessageType, ErrorCode,
     NodeMetrics, ChunkAssembler, parse_chunk, setup_logging,
+    PROTOCOL_VERSION, MAX_PAYLOAD_SIZE, RECV_BATCH_SIZE,
     DEFAULT_WORKER_TIMEOUT, DEFAULT_REQUEST_TIMEOUT
 )
 
@@ -35,6 +53,17 @@ PORT_HEALTH_HTTP = int(os.getenv("DCF_HEALTH_PORT", "8080"))
 WORKER_TIMEOUT = float(os.getenv("DCF_WORKER_TIMEOUT", str(DEFAULT_WORKER_TIMEOUT)))
 REQUEST_TIMEOUT = float(os.getenv("DCF_REQUEST_TIMEOUT", str(DEFAULT_REQUEST_TIMEOUT)))
 MAX_PENDING_REQUESTS = int(os.getenv("DCF_MAX_PENDING", "10000"))
+CHUNK_TIMEOUT = 60.0  # Seconds before a partial chunk assembly is dropped
+# Integer-nanosecond forms for comparisons against time.monotonic_ns()
+WORKER_TIMEOUT_NS = int(WORKER_TIMEOUT * 1_000_000_000)
+REQUEST_TIMEOUT_NS = int(REQUEST_TIMEOUT * 1_000_000_000)
+CHUNK_TIMEOUT_NS = int(CHUNK_TIMEOUT * 1_000_000_000)
+MAINTENANCE_INTERVAL = 5.0
+MAX_WORKERS = int(os.getenv("DCF_MAX_WORKERS", "256"))  # Initial registry capacity (grows)
+REQUEST_SLOTS = 1 << 16  # Pending-request ring size, must be a power of two
+REQUEST_SLOT_MASK = REQUEST_SLOTS - 1
+BUSY_POLL_US = int(os.getenv("DCF_BUSY_POLL_US", "0"))  # 0 disables NAPI busy polling
+HEAD_PROCESSES = int(os.getenv("DCF_HEAD_PROCESSES", "1"))  # 0 = one per CPU
 
 logger = setup_logging("HEAD")
 
@@ -43,49 +72,88 @@ logger = setup_logging("HEAD")
 # Worker Registry with Health Tracking
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@dataclass
-class WorkerInfo:
-    """Tracks individual worker state."""
-    addr: Tuple[str, int]
-    last_heartbeat: float
-    tasks_completed: int = 0
-    tasks_failed: int = 0
-    avg_latency_ms: float = 0.0
-    current_task: Optional[int] = None  # Sequence number of active task
-    
-    def is_healthy(self, timeout: float = WORKER_TIMEOUT) -> bool:
-        return time.time() - self.last_heartbeat < timeout
-    
-    def is_busy(self) -> bool:
-        return self.current_task is not None
-
-
 class WorkerRegistry:
     """
-    Thread-safe worker registry with round-robin load balancing.
+    Worker registry with idle-first load balancing, stored column-wise.
+    
+    Per-worker state lives in parallel NumPy arrays (structure-of-arrays)
+    over the first _count slots, so health, idle and stale scans are single
+    vectorized comparisons instead of attribute walks over Python objects.
+    _index maps addr -> slot for O(1) heartbeat and task bookkeeping;
+    removal swaps the last slot into the hole to keep the arrays dense.
+    Times are time.monotonic_ns() integers.
+    
+    Single-writer: every method except snapshot() must be called from the
+    event loop thread, so no locks are taken. Other threads (the HTTP
+    health server) read an immutable stats dict published by the loop.
     
     Features:
     - Automatic stale worker pruning
-    - Load-aware routing (prefers idle workers)
+    - Idle workers preferred, rotated round-robin
+    - Round-robin fallback among healthy workers when all are busy
     - Health metrics per worker
     """
     
-    def __init__(self):
-        self._workers: Dict[Tuple[str, int], WorkerInfo] = {}
-        self._lock = threading.RLock()
+    # EMA weight for per-worker latency; higher reacts faster to change
+    _latency_alpha = 0.01
+    # get_stats() memoization window (ns), protects /metrics from scrape storms
+    _stats_ttl_ns = 1_000_000_000
+    
+    def __init__(self, capacity: int = MAX_WORKERS):
+        self._count = 0
+        self._addrs: List[Tuple[str, int]] = []
+        self._index: Dict[Tuple[str, int], int] = {}
+        self._last_hb = np.zeros(capacity, dtype=np.int64)
+        self._busy = np.zeros(capacity, dtype=np.bool_)
+        self._current_task = np.zeros(capacity, dtype=np.int64)  # Valid where _busy
+        self._completed = np.zeros(capacity, dtype=np.int64)
+        self._failed = np.zeros(capacity, dtype=np.int64)
+        self._avg_latency = np.zeros(capacity, dtype=np.float32)
         self._rr_index = 0
         self._logger = setup_logging("REGISTRY")
+        # (built_at, stats); replaced as one reference so readers never see a torn pair
+        self._stats_cache: Tuple[int, dict] = (0, {})
+        self._publish_stats(time.monotonic_ns())
+
+    def _columns(self) -> Tuple[np.ndarray, ...]:
+        return (self._last_hb, self._busy, self._current_task,
+                self._completed, self._failed, self._avg_latency)
+
+    def _grow(self):
+        """Double array capacity (rare: only when the cluster outgrows MAX_WORKERS)."""
+        capacity = 2 * len(self._last_hb)
+        (self._last_hb, self._busy, self._current_task,
+         self._completed, self._failed, self._avg_latency) = (
+            np.concatenate([col, np.zeros_like(col)]) for col in self._columns()
+        )
+        self._logger.info(f"Registry capacity raised to {capacity} workers")
+
+    def _healthy_mask(self, now_ns: int) -> np.ndarray:
+        return self._last_hb[:self._count] > now_ns - WORKER_TIMEOUT_NS
 
     def register(self, addr: Tuple[str, int]) -> bool:
         """Register or refresh a worker. Returns True if new registration."""
-        with self._lock:
-            is_new = addr not in self._workers
-            if is_new:
-                self._workers[addr] = WorkerInfo(addr=addr, last_heartbeat=time.time())
-                self._logger.info(f"✓ Worker registered: {addr[0]}:{addr[1]}")
-            else:
-                self._workers[addr].last_heartbeat = time.time()
-            return is_new
+        now = time.monotonic_ns()
+        idx = self._index.get(addr)
+        if idx is not None:
+            self._last_hb[idx] = now
+            return False
+        
+        if self._count == len(self._last_hb):
+            self._grow()
+        idx = self._count
+        self._count += 1
+        self._addrs.append(addr)
+        self._index[addr] = idx
+        self._last_hb[idx] = now
+        self._busy[idx] = False
+        self._completed[idx] = 0
+        self._failed[idx] = 0
+        self._avg_latency[idx] = 0.0
+        
+        self._publish_stats(now)  # Membership changed: /ready must see it now
+        self._logger.info(f"✓ Worker registered: {addr[0]}:{addr[1]}")
+        return True
 
     def get_worker(self, prefer_idle: bool = True) -> Optional[Tuple[str, int]]:
         """
@@ -93,188 +161,415 @@ class WorkerRegistry:
         
         Priority: idle workers first, then round-robin among busy ones.
         """
-        with self._lock:
-            now = time.time()
-            healthy = [w for w in self._workers.values() if w.is_healthy(WORKER_TIMEOUT)]
-            
-            if not healthy:
-                return None
-            
-            # Prefer idle workers
-            if prefer_idle:
-                idle = [w for w in healthy if not w.is_busy()]
-                if idle:
-                    return idle[0].addr
-            
-            # Round-robin fallback
-            self._rr_index = (self._rr_index + 1) % len(healthy)
-            return healthy[self._rr_index].addr
+        if not self._count:
+            return None
+        healthy = self._healthy_mask(time.monotonic_ns())
+        
+        if prefer_idle:
+            idle = np.flatnonzero(healthy & ~self._busy[:self._count])
+            if idle.size:
+                self._rr_index += 1
+                return self._addrs[idle[self._rr_index % idle.size]]
+        
+        # Round-robin fallback
+        candidates = np.flatnonzero(healthy)
+        if not candidates.size:
+            return None
+        self._rr_index += 1
+        return self._addrs[candidates[self._rr_index % candidates.size]]
+
+    def load(self) -> Tuple[int, int]:
+        """(healthy, idle) worker counts right now (event loop only)."""
+        if not self._count:
+            return 0, 0
+        healthy = self._healthy_mask(time.monotonic_ns())
+        idle = healthy & ~self._busy[:self._count]
+        return int(np.count_nonzero(healthy)), int(np.count_nonzero(idle))
 
     def assign_task(self, addr: Tuple[str, int], sequence: int):
         """Mark worker as busy with a task."""
-        with self._lock:
-            if addr in self._workers:
-                self._workers[addr].current_task = sequence
+        idx = self._index.get(addr)
+        if idx is not None:
+            self._busy[idx] = True
+            self._current_task[idx] = sequence
 
     def complete_task(self, addr: Tuple[str, int], latency_ms: float, success: bool = True):
         """Mark task as complete on worker."""
-        with self._lock:
-            if addr in self._workers:
-                worker = self._workers[addr]
-                worker.current_task = None
-                if success:
-                    worker.tasks_completed += 1
-                    # Rolling average
-                    n = worker.tasks_completed
-                    worker.avg_latency_ms = ((n - 1) * worker.avg_latency_ms + latency_ms) / n
-                else:
-                    worker.tasks_failed += 1
+        idx = self._index.get(addr)
+        if idx is None:
+            return
+        self._busy[idx] = False
+        if success:
+            self._completed[idx] += 1
+            # Exponential moving average, seeded with the first sample
+            if self._completed[idx] == 1:
+                self._avg_latency[idx] = latency_ms
+            else:
+                self._avg_latency[idx] += self._latency_alpha * (latency_ms - self._avg_latency[idx])
+        else:
+            self._failed[idx] += 1
 
     def prune_stale(self) -> int:
         """Remove workers that haven't sent heartbeats. Returns count removed."""
-        with self._lock:
-            now = time.time()
-            stale = [addr for addr, w in self._workers.items() 
-                     if not w.is_healthy(WORKER_TIMEOUT)]
-            for addr in stale:
-                self._logger.warning(f"✗ Worker stale, removing: {addr[0]}:{addr[1]}")
-                del self._workers[addr]
-            return len(stale)
+        if not self._count:
+            return 0
+        now = time.monotonic_ns()
+        stale = np.flatnonzero(~self._healthy_mask(now))
+        # Highest slot first, so swap-removal never moves a pending stale slot
+        for idx in stale[::-1].tolist():
+            addr = self._addrs[idx]
+            self._logger.warning(f"✗ Worker stale, removing: {addr[0]}:{addr[1]}")
+            self._remove(idx)
+        if stale.size:
+            self._publish_stats(now)
+        return int(stale.size)
+
+    def _remove(self, idx: int):
+        """Swap the last slot into idx and shrink."""
+        last = self._count - 1
+        del self._index[self._addrs[idx]]
+        if idx != last:
+            for col in self._columns():
+                col[idx] = col[last]
+            moved = self._addrs[last]
+            self._addrs[idx] = moved
+            self._index[moved] = idx
+        self._addrs.pop()
+        self._count = last
 
     def get_stats(self) -> dict:
-        """Get registry statistics."""
-        with self._lock:
-            healthy = [w for w in self._workers.values() if w.is_healthy()]
-            busy = [w for w in healthy if w.is_busy()]
-            return {
-                "total_workers": len(self._workers),
-                "healthy_workers": len(healthy),
-                "busy_workers": len(busy),
-                "workers": [
-                    {
-                        "addr": f"{w.addr[0]}:{w.addr[1]}",
-                        "healthy": w.is_healthy(),
-                        "busy": w.is_busy(),
-                        "tasks_completed": w.tasks_completed,
-                        "avg_latency_ms": round(w.avg_latency_ms, 2)
-                    }
-                    for w in self._workers.values()
-                ]
-            }
+        """Get registry statistics, memoized for _stats_ttl_ns (event loop only)."""
+        now = time.monotonic_ns()
+        built_at, stats = self._stats_cache
+        if now - built_at < self._stats_ttl_ns:
+            return stats
+        return self._publish_stats(now)
+
+    def snapshot(self) -> dict:
+        """Last published statistics. Safe to call from any thread; do not mutate."""
+        return self._stats_cache[1]
+
+    def _publish_stats(self, now: int) -> dict:
+        """Rebuild statistics and publish them with a single reference swap."""
+        n = self._count
+        healthy = self._healthy_mask(now)
+        busy = self._busy[:n]
+        
+        stats = {
+            "total_workers": n,
+            "healthy_workers": int(np.count_nonzero(healthy)),
+            "busy_workers": int(np.count_nonzero(healthy & busy)),
+            "workers": [
+                {
+                    "addr": f"{addr[0]}:{addr[1]}",
+                    "healthy": h,
+                    "busy": b,
+                    "tasks_completed": c,
+                    "avg_latency_ms": round(lat, 2)
+                }
+                for addr, h, b, c, lat in zip(
+                    self._addrs, healthy.tolist(), busy.tolist(),
+                    self._completed[:n].tolist(), self._avg_latency[:n].tolist()
+                )
+            ]
+        }
+        self._stats_cache = (now, stats)
+        return stats
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # Request Tracking with TTL
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@dataclass
+@dataclass(slots=True)
 class PendingRequest:
-    """Tracks an in-flight request."""
+    """Tracks an in-flight request. created_at is time.monotonic_ns()."""
+    sequence: int
     client_addr: Tuple[str, int]
     worker_addr: Optional[Tuple[str, int]]
-    created_at: float
+    created_at: int
     payload_size: int
     
-    def is_expired(self, timeout: float = REQUEST_TIMEOUT) -> bool:
-        return time.time() - self.created_at > timeout
+    def is_expired(self, timeout_ns: int = REQUEST_TIMEOUT_NS) -> bool:
+        return time.monotonic_ns() - self.created_at > timeout_ns
 
 
 class RequestTracker:
     """
     Manages pending requests with automatic timeout cleanup.
     
+    Requests live in a fixed ring of REQUEST_SLOTS entries indexed by the
+    low bits of the sequence number: no hashing and no per-entry dict churn.
+    A slot already holding a different in-flight request is a collision and
+    the new request is rejected rather than overwriting it.
+    
+    Single-writer: mutated only from the event loop thread, so no lock.
+    Other threads read get_stats(), a dict the loop republishes each
+    maintenance tick (a plain attribute swap, atomic under the GIL).
+    
     Prevents memory leaks from orphaned requests.
     """
     
     def __init__(self, max_pending: int = MAX_PENDING_REQUESTS):
-        self._requests: Dict[int, PendingRequest] = {}
-        self._lock = threading.Lock()
+        self._slots: List[Optional[PendingRequest]] = [None] * REQUEST_SLOTS
+        self._count = 0
         self._max_pending = max_pending
         self._logger = setup_logging("REQUESTS")
+        self._stats_snapshot: dict = {}
+        self.publish_stats()
+
+    def in_flight(self, sequence: int) -> Optional[PendingRequest]:
+        """The in-flight request occupying sequence's ring slot, if any."""
+        return self._slots[sequence & REQUEST_SLOT_MASK]
 
     def add(self, sequence: int, client_addr: Tuple[str, int], 
             worker_addr: Optional[Tuple[str, int]], payload_size: int) -> bool:
-        """Add a pending request. Returns False if at capacity."""
-        with self._lock:
-            if len(self._requests) >= self._max_pending:
-                self._logger.warning("Request queue at capacity!")
-                return False
-            self._requests[sequence] = PendingRequest(
-                client_addr=client_addr,
-                worker_addr=worker_addr,
-                created_at=time.time(),
-                payload_size=payload_size
-            )
-            return True
+        """Add a pending request. Returns False if at capacity or the slot is taken."""
+        idx = sequence & REQUEST_SLOT_MASK
+        if self._count >= self._max_pending:
+            self._logger.warning("Request queue at capacity!")
+            return False
+        if self._slots[idx] is not None:
+            self._logger.warning("Request %d collides with in-flight request %d",
+                                 sequence, self._slots[idx].sequence)
+            return False
+        self._slots[idx] = PendingRequest(
+            sequence=sequence,
+            client_addr=client_addr,
+            worker_addr=worker_addr,
+            created_at=time.monotonic_ns(),
+            payload_size=payload_size
+        )
+        self._count += 1
+        return True
 
     def complete(self, sequence: int) -> Optional[PendingRequest]:
         """Remove and return a completed request."""
-        with self._lock:
-            return self._requests.pop(sequence, None)
+        idx = sequence & REQUEST_SLOT_MASK
+        request = self._slots[idx]
+        if request is None or request.sequence != sequence:
+            return None
+        self._slots[idx] = None
+        self._count -= 1
+        return request
 
     def cleanup_expired(self) -> int:
-        """Remove expired requests. Returns count removed."""
-        with self._lock:
-            now = time.time()
-            expired = [seq for seq, req in self._requests.items() if req.is_expired()]
-            for seq in expired:
-                self._logger.warning(f"Request {seq} expired after {REQUEST_TIMEOUT}s")
-                del self._requests[seq]
-            return len(expired)
+        """Remove expired requests with one linear pass over the ring. Returns count removed."""
+        if not self._count:
+            return 0
+        cutoff = time.monotonic_ns() - REQUEST_TIMEOUT_NS
+        slots = self._slots
+        expired = [idx for idx, req in enumerate(slots)
+                   if req is not None and req.created_at < cutoff]
+        for idx in expired:
+            self._logger.warning("Request %d expired after %ss", slots[idx].sequence, REQUEST_TIMEOUT)
+            slots[idx] = None
+        self._count -= len(expired)
+        return len(expired)
+
+    def publish_stats(self):
+        """Publish a fresh stats snapshot (event loop only)."""
+        self._stats_snapshot = {
+            "pending_requests": self._count,
+            "max_pending": self._max_pending
+        }
 
     def get_stats(self) -> dict:
-        with self._lock:
-            return {
-                "pending_requests": len(self._requests),
-                "max_pending": self._max_pending
-            }
+        """Last published statistics. Safe to call from any thread; do not mutate."""
+        return self._stats_snapshot
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Multi-process Task Hand-off
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Handed-off task: client IPv4 address and port, then the client's datagram
+_HANDOFF_HEADER = struct.Struct("!4sH")
+
+
+class SiblingLink:
+    """
+    Lets head processes sharing the UDP ports via SO_REUSEPORT serve every
+    client from every worker.
+
+    The kernel hashes each flow's 4-tuple to one process. A worker's
+    heartbeats and results therefore always reach the same process (its
+    home), while a client's tasks may land on a process with few or no
+    workers. Each process publishes its (healthy, idle) worker counts in a
+    shared load table; a process that has no idle worker hands the client's
+    TASK datagram to the sibling with the most idle workers over an
+    AF_UNIX datagram socket. The home process tracks the request and replies
+    to the client itself, so results never cross processes.
+
+    Created in the parent before fork; each child calls attach() with its
+    index. Process i republishes exact counts in row i; a sender also
+    decrements the receiver's idle count as it hands off, so a burst is not
+    all sent to one sibling before that sibling catches up. The table is a
+    routing hint, so unsynchronized writes are acceptable.
+    """
+
+    def __init__(self, count: int):
+        self.count = count
+        self.index = 0
+        self._rr_index = 0
+        # Anonymous mmap is MAP_SHARED, so children see each other's writes
+        self._shm = mmap.mmap(-1, count * 2 * 8)
+        self.load = np.frombuffer(self._shm, dtype=np.int64).reshape(count, 2)
+        # One (receive, send) datagram pair per process
+        self._pairs = [socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM) for _ in range(count)]
+        for rx, tx in self._pairs:
+            rx.setblocking(False)
+            tx.setblocking(False)
+
+    def attach(self, index: int):
+        """Take the receive end for process `index`; drop the others (child, after fork)."""
+        self.index = index
+        for i, (rx, _) in enumerate(self._pairs):
+            if i != index:
+                rx.close()
+
+    def fileno(self) -> int:
+        return self._pairs[self.index][0].fileno()
+
+    def publish(self, healthy: int, idle: int):
+        """Publish this process's worker counts."""
+        self.load[self.index] = (healthy, idle)
+
+    def healthy_workers(self) -> int:
+        """Healthy workers across all processes. Safe from any thread."""
+        return int(self.load[:, 0].sum())
+
+    def pick(self, healthy: int, idle: int) -> Optional[int]:
+        """
+        Sibling that should take a task this process would serve with
+        (healthy, idle) local workers, or None to keep it.
+
+        Local idle workers win, then the sibling with the most idle workers.
+        When every worker is busy, tasks are spread round-robin across the
+        processes in proportion to their healthy workers.
+        """
+        if idle:
+            return None
+        idle_counts = self.load[:, 1].copy()
+        idle_counts[self.index] = 0
+        best = int(np.argmax(idle_counts))
+        if idle_counts[best] > 0:
+            return best
+        
+        healthy_counts = self.load[:, 0].copy()
+        healthy_counts[self.index] = healthy
+        total = int(healthy_counts.sum())
+        if not total:
+            return None
+        self._rr_index += 1
+        target = int(np.searchsorted(np.cumsum(healthy_counts), self._rr_index % total, side="right"))
+        return None if target == self.index else target
+
+    def send_task(self, sibling: int, data: bytes, client_addr: Tuple[str, int]) -> bool:
+        """Hand a client's TASK datagram to a sibling. False if it could not be queued."""
+        # Claim one idle worker before sending; the sibling republishes once it routes
+        idle = int(self.load[sibling, 1])
+        if idle > 0:
+            self.load[sibling, 1] = idle - 1
+        try:
+            header = _HANDOFF_HEADER.pack(socket.inet_aton(client_addr[0]), client_addr[1])
+            self._pairs[sibling][1].sendmsg([header, data])
+            return True
+        except OSError:
+            return False
+
+    def recv_tasks(self) -> List[Tuple[bytes, Tuple[str, int]]]:
+        """Drain up to RECV_BATCH_SIZE handed-off tasks as (datagram, client_addr)."""
+        rx = self._pairs[self.index][0]
+        tasks = []
+        for _ in range(RECV_BATCH_SIZE):
+            try:
+                data = rx.recv(65536 + _HANDOFF_HEADER.size)
+            except BlockingIOError:
+                break
+            ip, port = _HANDOFF_HEADER.unpack_from(data)
+            tasks.append((data[_HANDOFF_HEADER.size:], (socket.inet_ntoa(ip), port)))
+        return tasks
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # HTTP Health Server
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# /health is constant apart from the timestamp, so render it from a template
+_HEALTH_BODY = b'{"status": "healthy", "timestamp": %f}'
+
+
+def _json_bytes(data: dict) -> bytes:
+    """Encode a response body, preferring orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+
 class HealthHandler(BaseHTTPRequestHandler):
     """HTTP handler for health checks and metrics."""
     
     registry: WorkerRegistry = None
     tracker: RequestTracker = None
     metrics: NodeMetrics = None
+    siblings: Optional[SiblingLink] = None
+    
+    _routes = {
+        "/health": "_health",
+        "/ready": "_ready",
+        "/metrics": "_metrics",
+    }
     
     def log_message(self, format, *args):
         pass  # Suppress default logging
     
     def do_GET(self):
-        if self.path == "/health":
-            self._send_json({"status": "healthy", "timestamp": time.time()})
-        elif self.path == "/ready":
-            stats = self.registry.get_stats() if self.registry else {}
-            ready = stats.get("healthy_workers", 0) > 0
-            status = 200 if ready else 503
-            self._send_json({"ready": ready, "workers": stats.get("healthy_workers", 0)}, status)
-        elif self.path == "/metrics":
-            data = {
-                "node": self.metrics.to_dict() if self.metrics else {},
-                "registry": self.registry.get_stats() if self.registry else {},
-                "requests": self.tracker.get_stats() if self.tracker else {}
-            }
-            self._send_json(data)
+        getattr(self, self._routes.get(self.path, "_not_found"))()
+    
+    def _health(self):
+        self._send_body(_HEALTH_BODY % time.time())
+    
+    def _ready(self):
+        # Any process can route to any healthy worker, so readiness is cluster-wide
+        if self.siblings is not None:
+            workers = self.siblings.healthy_workers()
         else:
-            self._send_json({"error": "Not found"}, 404)
+            stats = self.registry.snapshot() if self.registry else {}
+            workers = stats.get("healthy_workers", 0)
+        ready = workers > 0
+        status = 200 if ready else 503
+        self._send_json({"ready": ready, "workers": workers}, status)
+    
+    def _metrics(self):
+        data = {
+            "node": self.metrics.to_dict() if self.metrics else {},
+            "registry": self.registry.snapshot() if self.registry else {},
+            "requests": self.tracker.get_stats() if self.tracker else {}
+        }
+        self._send_json(data)
+    
+    def _not_found(self):
+        self._send_json({"error": "Not found"}, 404)
     
     def _send_json(self, data: dict, status: int = 200):
+        self._send_body(_json_bytes(data), status)
+    
+    def _send_body(self, body: bytes, status: int = 200):
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.end_headers()
-        self.wfile.write(json.dumps(data, indent=2).encode())
+        self.wfile.write(body)
 
 
 def start_health_server(registry: WorkerRegistry, tracker: RequestTracker, 
-                        metrics: NodeMetrics, port: int = PORT_HEALTH_HTTP):
+                        metrics: NodeMetrics, port: int = PORT_HEALTH_HTTP,
+                        siblings: Optional[SiblingLink] = None):
     """Start HTTP health server in background thread."""
     HealthHandler.registry = registry
     HealthHandler.tracker = tracker
     HealthHandler.metrics = metrics
+    HealthHandler.siblings = siblings
     
     server = HTTPServer(("0.0.0.0", port), HealthHandler)
     thread = threading.Thread(target=server.serve_forever, daemon=True)
@@ -299,19 +594,37 @@ class HeadController:
     - Provide health/metrics endpoints
     """
     
-    def __init__(self):
+    def __init__(self, index: int = 0, reuse_port: bool = False, cpu: Optional[int] = None,
+                 siblings: Optional[SiblingLink] = None):
+        self.index = index
+        self.health_port = PORT_HEALTH_HTTP + index
+        self.siblings = siblings
+        
         self.registry = WorkerRegistry()
         self.tracker = RequestTracker()
         self.metrics = NodeMetrics()
         
-        self.sock_client = EventDrivenUDPSocket(PORT_CLIENT_INGRESS)
-        self.sock_internal = EventDrivenUDPSocket(PORT_WORKER_BUS)
+        self.sock_client = EventDrivenUDPSocket(
+            PORT_CLIENT_INGRESS, busy_poll_us=BUSY_POLL_US,
+            reuse_port=reuse_port, incoming_cpu=cpu
+        )
+        self.sock_internal = EventDrivenUDPSocket(
+            PORT_WORKER_BUS, busy_poll_us=BUSY_POLL_US,
+            reuse_port=reuse_port, incoming_cpu=cpu
+        )
         
         self._shutdown = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Owned by the event loop only; expiry via a (deadline, seq) min-heap
         self._chunk_assemblers: Dict[int, ChunkAssembler] = {}
+        self._chunk_deadlines: List[Tuple[int, int]] = []
         
-        # Start background maintenance
-        self._maintenance_thread = threading.Thread(target=self._maintenance_loop, daemon=True)
+        # Task counts since the last maintenance tick, logged as one summary line
+        self._routed_since_tick = 0
+        self._completed_since_tick = 0
+        self._failed_since_tick = 0
+        self._handed_off_since_tick = 0
         
     def start(self):
         """Start the head controller."""
@@ -320,70 +633,107 @@ class HeadController:
         logger.info("═" * 60)
         logger.info(f"  Client Port:   UDP {PORT_CLIENT_INGRESS}")
         logger.info(f"  Worker Port:   UDP {PORT_WORKER_BUS}")
-        logger.info(f"  Health Port:   HTTP {PORT_HEALTH_HTTP}")
+        logger.info(f"  Health Port:   HTTP {self.health_port}")
+        logger.info(f"  Event Loop:    {'uvloop' if uvloop is not None else 'asyncio'}")
+        logger.info(f"  Process:       {self.index + 1}/{max(HEAD_PROCESSES, 1)}")
         logger.info("═" * 60)
         
         # Start health server
         self._health_server = start_health_server(
-            self.registry, self.tracker, self.metrics
+            self.registry, self.tracker, self.metrics, self.health_port, self.siblings
         )
         
-        # Start maintenance thread
-        self._maintenance_thread.start()
-        
         # Main event loop
         self._run()
 
     def shutdown(self):
-        """Graceful shutdown."""
+        """Graceful shutdown. Safe to call from signal handlers and other threads."""
         logger.info("Initiating graceful shutdown...")
         self._shutdown.set()
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(loop.stop)
+                return  # _run tears down sockets once the loop exits
+            except RuntimeError:
+                pass  # Loop already closed
+        self._close_sockets()
+
+    def _close_sockets(self):
         self.sock_client.close()
         self.sock_internal.close()
         logger.info("Shutdown complete.")
 
     def _run(self):
-        """Main event loop using efficient I/O multiplexing."""
-        while not self._shutdown.is_set():
-            # Process worker messages (heartbeats, results)
-            self._process_internal()
-            
-            # Process client messages (tasks)
-            self._process_client()
+        """
+        Main event loop.
+        
+        Socket readiness and the maintenance timer are dispatched from one
+        asyncio loop (uvloop when installed). Readers drain with recvmmsg
+        batches rather than per-datagram protocol callbacks.
+        """
+        if self._shutdown.is_set():
+            return
+        
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        client_fd = self.sock_client.fileno()
+        internal_fd = self.sock_internal.fileno()
+        
+        loop.add_reader(client_fd, self._process_client)
+        loop.add_reader(internal_fd, self._process_internal)
+        if self.siblings is not None:
+            loop.add_reader(self.siblings.fileno(), self._process_siblings)
+        loop.call_later(MAINTENANCE_INTERVAL, self._maintenance_tick)
+        
+        try:
+            loop.run_forever()
+        finally:
+            loop.remove_reader(client_fd)
+            loop.remove_reader(internal_fd)
+            if self.siblings is not None:
+                loop.remove_reader(self.siblings.fileno())
+            self._loop = None
+            loop.close()
+            self._close_sockets()
 
     def _process_internal(self):
-        """Handle messages from workers."""
-        result = self.sock_internal.recv(timeout=0.001)
-        if not result:
-            return
+        """Handle one batch of pending worker messages (the reader re-fires if more remain)."""
+        for msg, addr in self.sock_internal.recv_batch():
+            self.metrics.messages_received += 1
+            self.metrics.bytes_received += len(msg.payload)
             
-        msg, addr = result
-        self.metrics.messages_received += 1
-        self.metrics.bytes_received += len(msg.payload)
-        
-        if msg.msg_type == MessageType.HEARTBEAT:
-            self._handle_heartbeat(msg, addr)
-        elif msg.msg_type == MessageType.RESULT:
-            self._handle_result(msg, addr)
-        elif msg.msg_type == MessageType.CHUNK:
-            self._handle_chunk(msg, addr)
-        elif msg.msg_type == MessageType.ERROR:
-            self._handle_worker_error(msg, addr)
+            if msg.msg_type == MessageType.HEARTBEAT:
+                self._handle_heartbeat(msg, addr)
+            elif msg.msg_type == MessageType.RESULT:
+                self._handle_result(msg, addr)
+            elif msg.msg_type == MessageType.CHUNK:
+                self._handle_chunk(msg, addr)
+            elif msg.msg_type == MessageType.ERROR:
+                self._handle_worker_error(msg, addr)
 
     def _process_client(self):
-        """Handle messages from clients."""
-        result = self.sock_client.recv(timeout=0.001)
-        if not result:
-            return
+        """Handle one batch of pending client messages (the reader re-fires if more remain)."""
+        for msg, client_addr in self.sock_client.recv_batch():
+            self.metrics.messages_received += 1
+            self.metrics.bytes_received += len(msg.payload)
             
-        msg, client_addr = result
-        self.metrics.messages_received += 1
-        self.metrics.bytes_received += len(msg.payload)
-        
-        if msg.msg_type == MessageType.TASK:
-            self._handle_task(msg, client_addr)
-        elif msg.msg_type == MessageType.HEALTH:
-            self._handle_health_request(msg, client_addr)
+            if msg.msg_type == MessageType.TASK:
+                self._handle_task(msg, client_addr)
+            elif msg.msg_type == MessageType.HEALTH:
+                self._handle_health_request(msg, client_addr)
+
+    def _process_siblings(self):
+        """Handle one batch of tasks handed over by sibling head processes."""
+        for data, client_addr in self.siblings.recv_tasks():
+            msg = DCFMessage.deserialize(data)
+            if msg is not None:
+                self._handle_task(msg, client_addr, handed_off=True)
+
+    def _publish_load(self):
+        """Refresh this process's row of the shared load table."""
+        if self.siblings is not None:
+            self.siblings.publish(*self.registry.load())
 
     def _handle_heartbeat(self, msg: DCFMessage, addr: Tuple[str, int]):
         """Process worker heartbeat."""
@@ -391,33 +741,41 @@ class HeadController:
             worker_port = int(msg.payload.decode('utf-8'))
             worker_addr = (addr[0], worker_port)
             self.registry.register(worker_addr)
+            self._publish_load()
         except (ValueError, UnicodeDecodeError) as e:
-            logger.warning(f"Invalid heartbeat from {addr}: {e}")
+            logger.warning("Invalid heartbeat from %s: %s", addr, e)
 
     def _handle_result(self, msg: DCFMessage, addr: Tuple[str, int]):
         """Process inference result from worker."""
         request = self.tracker.complete(msg.sequence)
         if not request:
-            logger.warning(f"Result {msg.sequence} has no pending request (timeout?)")
+            logger.warning("Result %d has no pending request (timeout?)", msg.sequence)
             return
         
         # Calculate latency
-        latency_ms = (time.time() - request.created_at) * 1000
+        latency_ms = (time.monotonic_ns() - request.created_at) / 1_000_000
         
         # Update worker stats
         if request.worker_addr:
             self.registry.complete_task(request.worker_addr, latency_ms, success=True)
+            self._publish_load()
         
-        # Forward to client
-        response = DCFMessage.result(msg.sequence, msg.payload)
-        self.sock_client.send_chunked(response, request.client_addr)
+        # Forward to client. A single-datagram result from the worker is
+        # already a valid RESULT frame, so relay its bytes without re-encoding
+        if msg.raw is not None and msg.version == PROTOCOL_VERSION and len(msg.payload) <= MAX_PAYLOAD_SIZE:
+            self.sock_client.send_raw(msg.raw, request.client_addr)
+        else:
+            response = DCFMessage.result(msg.sequence, msg.payload)
+            self.sock_client.send_chunked(response, request.client_addr)
         
         self.metrics.messages_sent += 1
         self.metrics.bytes_sent += len(msg.payload)
         self.metrics.tasks_processed += 1
         self.metrics.record_latency(latency_ms)
+        self._completed_since_tick += 1
         
-        logger.info(f"✓ Task {msg.sequence} complete → {request.client_addr[0]} ({latency_ms:.0f}ms)")
+        logger.debug("✓ Task %d complete → %s (%.0fms)",
+                     msg.sequence, request.client_addr[0], latency_ms)
 
     def _handle_chunk(self, msg: DCFMessage, addr: Tuple[str, int]):
         """Handle chunked result reassembly."""
@@ -425,10 +783,10 @@ class HeadController:
             total, idx, checksum, data = parse_chunk(msg)
             
             if msg.sequence not in self._chunk_assemblers:
-                self._chunk_assemblers[msg.sequence] = ChunkAssembler(
-                    total_chunks=total,
-                    checksum=checksum
-                )
+                assembler = ChunkAssembler(total_chunks=total, checksum=checksum)
+                self._chunk_assemblers[msg.sequence] = assembler
+                heapq.heappush(self._chunk_deadlines,
+                               (assembler.created_at + CHUNK_TIMEOUT_NS, msg.sequence))
             
             assembler = self._chunk_assemblers[msg.sequence]
             if assembler.add_chunk(idx, data):
@@ -441,10 +799,23 @@ class HeadController:
                     result_msg = DCFMessage.result(msg.sequence, complete_payload)
                     self._handle_result(result_msg, addr)
                 else:
-                    logger.error(f"Chunk assembly failed for {msg.sequence}")
+                    logger.error("Chunk assembly failed for %d", msg.sequence)
                     
         except Exception as e:
-            logger.error(f"Chunk processing error: {e}")
+            logger.error("Chunk processing error: %s", e)
+
+    def _expire_chunks(self):
+        """Drop chunk assemblies past their deadline (event loop only)."""
+        now = time.monotonic_ns()
+        heap = self._chunk_deadlines
+        while heap and heap[0][0] <= now:
+            deadline, seq = heapq.heappop(heap)
+            # Lazy deletion: the entry may belong to an assembly that already
+            # completed, or to an older one whose sequence number was reused
+            assembler = self._chunk_assemblers.get(seq)
+            if assembler is not None and assembler.created_at + CHUNK_TIMEOUT_NS <= deadline:
+                del self._chunk_assemblers[seq]
+                logger.warning("Cleaned up stale chunk assembly for %d", seq)
 
     def _handle_worker_error(self, msg: DCFMessage, addr: Tuple[str, int]):
         """Handle error from worker."""
@@ -452,20 +823,46 @@ class HeadController:
         if request:
             if request.worker_addr:
                 self.registry.complete_task(request.worker_addr, 0, success=False)
+                self._publish_load()
             
             # Forward error to client
             self.sock_client.send(msg, request.client_addr)
             self.metrics.tasks_failed += 1
-            logger.warning(f"✗ Task {msg.sequence} failed on worker {addr}")
-
-    def _handle_task(self, msg: DCFMessage, client_addr: Tuple[str, int]):
-        """Route incoming task to a worker."""
+            self._failed_since_tick += 1
+            logger.warning("✗ Task %d failed on worker %s:%d", msg.sequence, addr[0], addr[1])
+
+    def _handle_task(self, msg: DCFMessage, client_addr: Tuple[str, int],
+                     handed_off: bool = False):
+        """Route incoming task to a worker, or hand it to a sibling head with idle workers."""
+        if self.siblings is not None and not handed_off:
+            sibling = self.siblings.pick(*self.registry.load())
+            if sibling is not None:
+                data = msg.raw if msg.raw is not None else msg.serialize()
+                if self.siblings.send_task(sibling, data, client_addr):
+                    self._handed_off_since_tick += 1
+                    logger.debug("→ Task %d handed to head process %d", msg.sequence, sibling)
+                    return
+        
         worker_addr = self.registry.get_worker(prefer_idle=True)
         
         if not worker_addr:
             error = DCFMessage.error(msg.sequence, ErrorCode.NO_WORKERS, "No workers available")
             self.sock_client.send(error, client_addr)
-            logger.error(f"✗ No workers for task {msg.sequence}")
+            logger.error("✗ No workers for task %d", msg.sequence)
+            return
+        
+        # A taken ring slot is a duplicate or an aliased sequence, not a full server
+        occupant = self.tracker.in_flight(msg.sequence)
+        if occupant is not None:
+            if occupant.sequence == msg.sequence:
+                error = DCFMessage.error(msg.sequence, ErrorCode.INVALID_PAYLOAD,
+                                         f"Sequence {msg.sequence} is already in flight")
+            else:
+                error = DCFMessage.error(msg.sequence, ErrorCode.WORKER_BUSY,
+                                         f"Sequence {msg.sequence} collides with in-flight "
+                                         f"sequence {occupant.sequence}")
+            self.sock_client.send(error, client_addr)
+            logger.warning("✗ Task %d rejected: ring slot held by %d", msg.sequence, occupant.sequence)
             return
         
         # Track the request
@@ -476,14 +873,19 @@ class HeadController:
         
         # Mark worker as busy and forward
         self.registry.assign_task(worker_addr, msg.sequence)
+        self._publish_load()
         
-        fwd_msg = DCFMessage.task(msg.sequence, msg.payload)
-        self.sock_internal.send(fwd_msg, worker_addr)
+        # The client's TASK frame is forwarded byte-for-byte when it is current-version
+        if msg.raw is not None and msg.version == PROTOCOL_VERSION:
+            self.sock_internal.send_raw(msg.raw, worker_addr)
+        else:
+            self.sock_internal.send(DCFMessage.task(msg.sequence, msg.payload), worker_addr)
         
         self.metrics.messages_sent += 1
         self.metrics.bytes_sent += len(msg.payload)
+        self._routed_since_tick += 1
         
-        logger.info(f"→ Task {msg.sequence} routed to {worker_addr[0]}:{worker_addr[1]}")
+        logger.debug("→ Task %d routed to %s:%d", msg.sequence, worker_addr[0], worker_addr[1])
 
     def _handle_health_request(self, msg: DCFMessage, client_addr: Tuple[str, int]):
         """Respond to health check."""
@@ -497,35 +899,51 @@ class HeadController:
         )
         self.sock_client.send(response, client_addr)
 
-    def _maintenance_loop(self):
-        """Background maintenance tasks."""
-        while not self._shutdown.is_set():
-            time.sleep(5.0)
-            
+    def _maintenance_tick(self):
+        """Periodic maintenance, run on the event loop every MAINTENANCE_INTERVAL."""
+        try:
             # Prune stale workers
             pruned_workers = self.registry.prune_stale()
             
             # Cleanup expired requests
             expired_requests = self.tracker.cleanup_expired()
             
-            # Cleanup stale chunk assemblers
-            stale_chunks = [seq for seq, asm in self._chunk_assemblers.items() 
-                          if asm.is_stale()]
-            for seq in stale_chunks:
-                del self._chunk_assemblers[seq]
-                logger.warning(f"Cleaned up stale chunk assembly for {seq}")
+            # Cleanup stale chunk assemblies
+            self._expire_chunks()
+            
+            # Refresh the snapshots read by the HTTP health thread and siblings
+            self.registry.get_stats()
+            self.tracker.publish_stats()
+            self._publish_load()
             
-            if pruned_workers or expired_requests or stale_chunks:
-                logger.debug(f"Maintenance: pruned {pruned_workers} workers, "
-                           f"{expired_requests} requests, {len(stale_chunks)} chunks")
+            if pruned_workers or expired_requests:
+                logger.debug("Maintenance: pruned %d workers, %d requests",
+                             pruned_workers, expired_requests)
+            
+            # Per-task events log at DEBUG; INFO gets one summary per tick
+            if (self._routed_since_tick or self._completed_since_tick
+                    or self._failed_since_tick or self._handed_off_since_tick):
+                logger.info("Last %.0fs: %d routed, %d completed, %d failed, %d handed off",
+                            MAINTENANCE_INTERVAL, self._routed_since_tick,
+                            self._completed_since_tick, self._failed_since_tick,
+                            self._handed_off_since_tick)
+                self._routed_since_tick = 0
+                self._completed_since_tick = 0
+                self._failed_since_tick = 0
+                self._handed_off_since_tick = 0
+        finally:
+            if not self._shutdown.is_set():
+                self._loop.call_later(MAINTENANCE_INTERVAL, self._maintenance_tick)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # Entry Point
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def main():
-    controller = HeadController()
+def run_controller(index: int = 0, reuse_port: bool = False, cpu: Optional[int] = None,
+                   siblings: Optional[SiblingLink] = None):
+    """Run one controller in the current process until it is shut down."""
+    controller = HeadController(index, reuse_port, cpu, siblings)
     
     # Signal handlers for graceful shutdown
     def signal_handler(signum, frame):
@@ -544,5 +962,62 @@ def main():
         raise
 
 
+def run_multiprocess(count: int):
+    """
+    Fork `count` controllers sharing the UDP ports via SO_REUSEPORT.
+    
+    Each process registers the workers whose flows hash to it and hands
+    tasks it cannot serve to a sibling through a SiblingLink, so every
+    client reaches every worker. Child i serves health on
+    PORT_HEALTH_HTTP + i and is pinned to one CPU.
+    """
+    cpus = sorted(os.sched_getaffinity(0))
+    children: List[int] = []
+    siblings = SiblingLink(count)
+    
+    for index in range(count):
+        cpu = cpus[index % len(cpus)]
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                os.sched_setaffinity(0, {cpu})
+                siblings.attach(index)
+                run_controller(index, reuse_port=True, cpu=cpu, siblings=siblings)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        children.append(pid)
+    
+    def forward_signal(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+    
+    signal.signal(signal.SIGINT, forward_signal)
+    signal.signal(signal.SIGTERM, forward_signal)
+    
+    logger.info(f"Started {count} head processes: {children}")
+    for pid in children:
+        try:
+            os.waitpid(pid, 0)  # Retried across signals (PEP 475)
+        except ChildProcessError:
+            pass
+
+
+def main():
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
+    count = HEAD_PROCESSES if HEAD_PROCESSES > 0 else (os.cpu_count() or 1)
+    if count > 1:
+        run_multiprocess(count)
+    else:
+        run_controller()
+
+
 if __name__ == "__main__":
     main()
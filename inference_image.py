@@ -1,57 +1,152 @@
 #!/usr/bin/env python3
 import torch
-from diffusers import StableDiffusionPipeline, DPMSolverMultistepScheduler
+from diffusers import StableDiffusionPipeline
 import argparse
+import functools
+import json
 import os
 import sys
 
+from model_loading import enable_fused_attention, has_native_bf16, use_karras_scheduler
+
+def quantize_pipeline(pipe, mode):
+    """Weight-only quantize the UNet and text encoder (torchao, else optimum-quanto)."""
+    if mode == "none":
+        return
+    modules = [pipe.unet, pipe.text_encoder]
+    
+    try:
+        from torchao.quantization import quantize_
+        if mode == "int8":
+            from torchao.quantization import int8_weight_only as weight_config
+        else:
+            from torchao.quantization import float8_weight_only as weight_config
+        for module in modules:
+            quantize_(module, weight_config())
+        return
+    except ImportError:
+        pass
+    
+    try:
+        from optimum.quanto import quantize, freeze, qint8, qfloat8
+    except ImportError:
+        raise RuntimeError(f"--quant {mode} requires torchao or optimum-quanto")
+    for module in modules:
+        quantize(module, weights=qint8 if mode == "int8" else qfloat8)
+        freeze(module)
+
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+@functools.lru_cache(maxsize=1)
+def build_pipe(model, quant="none", compile_unet=False, warmup=False):
+    """
+    Load and optimize the pipeline once; later calls reuse it.
+    
+    Compilation and warmup cost tens of seconds up front and only pay off in
+    a long-lived process, so one-shot runs leave both off.
+    """
+    print(f"Initializing Image Pipeline on {DEVICE}...", file=sys.stderr)
+    
+    # bfloat16 on Ampere+ (fp16 range without overflow), float16 on older GPUs, float32 for CPU
+    if DEVICE == "cuda":
+        dtype = torch.bfloat16 if has_native_bf16() else torch.float16
+    else:
+        dtype = torch.float32
+    
+    pipe = StableDiffusionPipeline.from_pretrained(
+        model,
+        torch_dtype=dtype,
+        use_safetensors=True
+    )
+    use_karras_scheduler(pipe)
+    
+    # Move to device
+    pipe = pipe.to(DEVICE)
+    
+    # Quantize before compiling so the compiled graph sees the quantized weights
+    quantize_pipeline(pipe, quant)
+    
+    enable_fused_attention(pipe, DEVICE)
+    
+    if DEVICE == "cuda" and compile_unet:
+        pipe.unet = torch.compile(pipe.unet, mode="reduce-overhead", fullgraph=True)
+        pipe.vae.decode = torch.compile(pipe.vae.decode)
+    
+    # Warmup: trigger compilation and kernel autotuning before accepting work
+    if warmup:
+        with torch.inference_mode():
+            pipe("warmup", num_inference_steps=1)
+    
+    return pipe
+
+def generate(pipe, prompt, steps, guidance, output):
+    """Run one prompt through a loaded pipeline and save the image. Returns the absolute path."""
+    with torch.inference_mode():
+        image = pipe(
+            prompt,
+            num_inference_steps=steps,
+            guidance_scale=guidance
+        ).images[0]
+    
+    image.save(output)
+    return os.path.abspath(output)
+
+def serve(args):
+    """Persistent mode: one JSON request per stdin line, one JSON reply per stdout line."""
+    pipe = build_pipe(args.model, args.quant, compile_unet=not args.no_compile, warmup=True)
+    print("Ready", file=sys.stderr)
+    
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        
+        try:
+            req = json.loads(line)
+            path = generate(
+                pipe,
+                req["prompt"],
+                int(req.get("steps", args.steps)),
+                float(req.get("guidance", args.guidance)),
+                req.get("output", args.output)
+            )
+            reply = {"status": "ok", "output": path}
+        except Exception as e:
+            reply = {"status": "error", "error": str(e)}
+        
+        print(json.dumps(reply), flush=True)
+
 def main():
     parser = argparse.ArgumentParser(description="Stable Diffusion Image Inference")
-    parser.add_argument("--prompt", type=str, required=True, help="Text prompt for generation")
+    parser.add_argument("--prompt", type=str, help="Text prompt for generation")
     parser.add_argument("--model", type=str, default="runwayml/stable-diffusion-v1-5", help="HuggingFace Model ID")
     parser.add_argument("--output", type=str, default="output.png", help="Path to save the generated image")
-    parser.add_argument("--steps", type=int, default=25, help="Number of inference steps")
+    parser.add_argument("--steps", type=int, default=15, help="Number of inference steps")
     parser.add_argument("--guidance", type=float, default=7.5, help="Guidance scale (CFG)")
+    parser.add_argument("--no-compile", action="store_true", help="In --server mode, skip torch.compile of the UNet/VAE")
+    parser.add_argument("--quant", choices=["none", "int8", "fp8"], default="none",
+                        help="Weight-only quantization for UNet/text encoder (fp8 needs Ada/Hopper)")
+    parser.add_argument("--server", action="store_true",
+                        help="Keep the pipeline loaded and read JSON requests from stdin")
     
     args = parser.parse_args()
-
-    # Determine device
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    print(f"Initializing Image Pipeline on {device}...")
+    
+    if not args.server and not args.prompt:
+        parser.error("--prompt is required unless --server is given")
     
     try:
-        # Initialize pipeline
-        # Use float16 for GPU to save VRAM, float32 for CPU
-        dtype = torch.float16 if device == "cuda" else torch.float32
-        
-        pipe = StableDiffusionPipeline.from_pretrained(
-            args.model,
-            torch_dtype=dtype,
-            use_safetensors=True
-        )
-
-        # Optimize Scheduler for speed
-        pipe.scheduler = DPMSolverMultistepScheduler.from_config(pipe.scheduler.config)
+        if args.server:
+            serve(args)
+            return
         
-        # Move to device
-        pipe = pipe.to(device)
+        pipe = build_pipe(args.model, args.quant)
         
-        # Enable memory optimizations if on GPU
-        if device == "cuda":
-            pipe.enable_attention_slicing()
-            
         print(f"Generating image for prompt: '{args.prompt}'")
-        
-        # Run Inference
-        with torch.inference_mode():
-            image = pipe(
-                args.prompt,
-                num_inference_steps=args.steps,
-                guidance_scale=args.guidance
-            ).images[0]
-        
-        image.save(args.output)
-        print(f"Success! Image saved to: {os.path.abspath(args.output)}")
+        path = generate(pipe, args.prompt, args.steps, args.guidance, args.output)
+        print(f"Success! Image saved to: {path}")
         
     except Exception as e:
         print(f"Error during generation: {e}", file=sys.stderr)
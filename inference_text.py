@@ -1,59 +1,86 @@
 #!/usr/bin/env python3
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
+from transformers import AutoModelForCausalLM, AutoTokenizer, GenerationConfig
 import argparse
 import sys
 
+from model_loading import (
+    attention_implementation, default_llm_model, is_prequantized, llm_dtype, quantization_config_for
+)
+
+def to_device(batch, device):
+    """Move tokenizer output to the GPU via pinned memory so the copy is async."""
+    if device != "cuda":
+        return batch
+    return {k: v.pin_memory().to(device, non_blocking=True) for k, v in batch.items()}
+
 def main():
     parser = argparse.ArgumentParser(description="LLM Text Inference")
     parser.add_argument("--prompt", type=str, required=True, help="Input text prompt")
-    parser.add_argument("--model", type=str, default="mistralai/Mistral-7B-v0.1", help="HuggingFace Model ID")
+    parser.add_argument("--model", type=str, default=None,
+                        help="HuggingFace Model ID (*-GPTQ / *-AWQ use INT4 kernels)")
     parser.add_argument("--max_tokens", type=int, default=200, help="Maximum new tokens to generate")
     parser.add_argument("--temp", type=float, default=0.7, help="Sampling temperature")
+    parser.add_argument("--compile", action="store_true",
+                        help="torch.compile the forward pass with a static KV cache (CUDA graphs)")
     
     args = parser.parse_args()
     
     device = "cuda" if torch.cuda.is_available() else "cpu"
+    if args.model is None:
+        args.model = default_llm_model(device)
     print(f"Initializing Text Pipeline on {device}...")
 
+    # bfloat16 on Ampere+ (fp16 throughput without overflow/NaN in sampling).
+    # GPTQ/AWQ kernels are fp16-only, so those load in fp16 without autocast.
+    dtype = llm_dtype(args.model, device)
+    autocast = torch.autocast("cuda", dtype=dtype,
+                              enabled=device == "cuda" and not is_prequantized(args.model))
+
     try:
-        # Configure quantization (4-bit) for efficient loading on consumer GPUs
-        quantization_config = None
-        if device == "cuda":
-            quantization_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_compute_dtype=torch.float16,
-                bnb_4bit_use_double_quant=True,
-            )
+        # 4-bit weights: prequantized GPTQ/AWQ kernels, else bitsandbytes on CUDA
+        quantization_config = quantization_config_for(args.model, device)
 
         print(f"Loading Model: {args.model}")
         
-        tokenizer = AutoTokenizer.from_pretrained(args.model)
+        tokenizer = AutoTokenizer.from_pretrained(args.model, use_fast=True)
         
         # Load model with quantization if available
         model = AutoModelForCausalLM.from_pretrained(
             args.model,
             quantization_config=quantization_config,
             device_map="auto" if device == "cuda" else None,
-            torch_dtype=torch.float16 if device == "cuda" else torch.float32,
+            torch_dtype=dtype,
+            attn_implementation=attention_implementation(device),
             use_safetensors=True
         )
         
+        # One GenerationConfig, shared by warmup and the real call
+        generation_config = GenerationConfig(
+            max_new_tokens=args.max_tokens,
+            do_sample=True,
+            temperature=args.temp,
+            pad_token_id=tokenizer.eos_token_id,
+            eos_token_id=tokenizer.eos_token_id
+        )
+        
+        # Static KV cache keeps decode shapes fixed so reduce-overhead can
+        # capture each step as a CUDA graph and replay it
+        if args.compile and device == "cuda":
+            model.forward = torch.compile(model.forward, mode="reduce-overhead", fullgraph=True)
+            generation_config.cache_implementation = "static"
+            print("Warming up compiled decoder...")
+            warmup = to_device(tokenizer("warmup", return_tensors="pt"), device)
+            with torch.inference_mode(), autocast:
+                model.generate(**warmup, generation_config=generation_config)
+        
         # Tokenize
-        inputs = tokenizer(args.prompt, return_tensors="pt")
-        if device == "cuda":
-            inputs = inputs.to("cuda")
+        inputs = to_device(tokenizer(args.prompt, return_tensors="pt"), device)
 
         print("Generating response...")
         
-        with torch.no_grad():
-            outputs = model.generate(
-                **inputs, 
-                max_new_tokens=args.max_tokens,
-                do_sample=True,
-                temperature=args.temp,
-                pad_token_id=tokenizer.eos_token_id
-            )
+        with torch.inference_mode(), autocast:
+            outputs = model.generate(**inputs, generation_config=generation_config)
             
         decoded_output = tokenizer.decode(outputs[0], skip_special_tokens=True)
         
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+HydraMesh Model Loading v5.1.0
+Model selection and load-time settings shared by the inference entry points
+
+Copyright (c) 2026 DeMoD LLC. All rights reserved.
+Licensed under BSD-3-Clause.
+"""
+
+import importlib.util
+from typing import Optional
+
+import torch
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Precision
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def has_native_bf16() -> bool:
+    """
+    True on GPUs with bf16 tensor cores (compute capability 8.0+, Ampere on).
+
+    torch.cuda.is_bf16_supported() also counts emulated bf16, so it is True
+    on Turing and Volta, which run bf16 without tensor cores.
+    """
+    return torch.cuda.is_available() and torch.cuda.get_device_capability()[0] >= 8
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LLM Loading
+# ═══════════════════════════════════════════════════════════════════════════════
+
+BASE_LLM_MODEL = "mistralai/Mistral-7B-v0.1"
+GPTQ_LLM_MODEL = "TheBloke/Mistral-7B-v0.1-GPTQ"
+
+
+def default_llm_model(device: str) -> str:
+    """
+    Prequantized GPTQ mirror on CUDA when transformers can load it: a GPTQ
+    kernel backend plus optimum, which GPTQConfig loading goes through.
+    """
+    if (device == "cuda" and importlib.util.find_spec("optimum")
+            and (importlib.util.find_spec("auto_gptq") or importlib.util.find_spec("gptqmodel"))):
+        return GPTQ_LLM_MODEL
+    return BASE_LLM_MODEL
+
+
+def attention_implementation(device: str) -> str:
+    """FlashAttention-2 when installed on CUDA, else PyTorch's fused SDPA kernels."""
+    if device == "cuda" and importlib.util.find_spec("flash_attn"):
+        return "flash_attention_2"
+    return "sdpa"
+
+
+def is_prequantized(model_id: str) -> bool:
+    """GPTQ/AWQ checkpoints, recognized by their -GPTQ / -AWQ repo suffix."""
+    return model_id.rstrip("/").upper().endswith(("-GPTQ", "-AWQ"))
+
+
+def llm_dtype(model_id: str, device: str, cpu_dtype: torch.dtype = torch.float32) -> torch.dtype:
+    """
+    Activation dtype for loading model_id. The exllama-v2 GPTQ and AWQ
+    kernels are fp16-only, so prequantized checkpoints load in fp16 (bf16
+    would add a cast at every quantized linear). Other models use bf16 on
+    GPUs with native bf16, fp16 on older GPUs, and cpu_dtype on the CPU.
+    """
+    if device != "cuda":
+        return cpu_dtype
+    if is_prequantized(model_id) or not has_native_bf16():
+        return torch.float16
+    return torch.bfloat16
+
+
+def half_precision_bytes(model_id: str) -> int:
+    """Weight footprint of model_id in fp16/bf16, sized on the meta device (no download of weights)."""
+    from accelerate import init_empty_weights
+    from transformers import AutoConfig, AutoModelForCausalLM
+
+    config = AutoConfig.from_pretrained(model_id)
+    with init_empty_weights():
+        model = AutoModelForCausalLM.from_config(config)
+    return sum(p.numel() for p in model.parameters()) * 2
+
+
+def kv_cache_bytes(model_id: str, batch: int, tokens: int) -> int:
+    """Half-precision KV cache for `batch` sequences of `tokens` tokens, from model_id's config."""
+    from transformers import AutoConfig
+
+    config = AutoConfig.from_pretrained(model_id)
+    heads = config.num_attention_heads
+    kv_heads = getattr(config, "num_key_value_heads", None) or heads
+    head_dim = getattr(config, "head_dim", None) or config.hidden_size // heads
+    # K and V, per layer, per token, 2 bytes each
+    return 2 * config.num_hidden_layers * kv_heads * head_dim * 2 * batch * tokens
+
+
+def quantization_config_for(model_id: str, device: str, reserve_bytes: int = 0):
+    """
+    GPTQ checkpoints get the exllama-v2 INT4 kernels; AWQ checkpoints carry
+    their own config. Other models load unquantized when the half-precision
+    weights fit in free VRAM less reserve_bytes (bnb 4-bit is slower than
+    fp16 at batch 1), and fall back to bitsandbytes NF4 with bf16 compute
+    otherwise. Callers hosting other models or large batches pass what they
+    need to keep free as reserve_bytes.
+    """
+    from transformers import BitsAndBytesConfig, GPTQConfig
+
+    name = model_id.rstrip("/").upper()
+    if name.endswith("-GPTQ"):
+        return GPTQConfig(bits=4, use_exllama=True, exllama_config={"version": 2})
+    if name.endswith("-AWQ"):
+        return None  # Read from the checkpoint's quantization_config
+    if device != "cuda":
+        return None
+
+    if torch.cuda.mem_get_info()[0] - reserve_bytes > half_precision_bytes(model_id) * 1.2:
+        return None
+    return BitsAndBytesConfig(
+        load_in_4bit=True,
+        bnb_4bit_quant_type="nf4",
+        bnb_4bit_compute_dtype=torch.bfloat16 if has_native_bf16() else torch.float16,
+        bnb_4bit_use_double_quant=False,
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Stable Diffusion Loading
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def sd_pipeline_bytes(model_id: str) -> int:
+    """fp16 weight footprint of an SD pipeline's UNet, VAE and text encoder, sized on the meta device."""
+    from accelerate import init_empty_weights
+    from diffusers import AutoencoderKL, UNet2DConditionModel
+    from transformers import CLIPTextConfig, CLIPTextModel
+
+    with init_empty_weights():
+        modules = [
+            UNet2DConditionModel.from_config(UNet2DConditionModel.load_config(model_id, subfolder="unet")),
+            AutoencoderKL.from_config(AutoencoderKL.load_config(model_id, subfolder="vae")),
+            CLIPTextModel(CLIPTextConfig.from_pretrained(model_id, subfolder="text_encoder")),
+        ]
+    return sum(p.numel() for m in modules for p in m.parameters()) * 2
+
+
+def use_karras_scheduler(pipe):
+    """Swap in DPM-Solver++ 2M Karras, which reaches comparable quality in ~15 steps."""
+    from diffusers import DPMSolverMultistepScheduler
+
+    pipe.scheduler = DPMSolverMultistepScheduler.from_config(
+        pipe.scheduler.config,
+        algorithm_type="dpmsolver++",
+        use_karras_sigmas=True
+    )
+
+
+def enable_fused_attention(pipe, device: str) -> Optional[str]:
+    """
+    Fused UNet attention: PyTorch SDPA (FlashAttention / mem-efficient
+    kernels), or xformers on older torch. Attention slicing is left as an
+    OOM fallback. Returns the backend enabled, or None.
+    """
+    if hasattr(torch.nn.functional, "scaled_dot_product_attention"):
+        from diffusers.models.attention_processor import AttnProcessor2_0
+        pipe.unet.set_attn_processor(AttnProcessor2_0())
+        return "sdpa"
+    if device == "cuda":
+        try:
+            pipe.enable_xformers_memory_efficient_attention()
+            return "xformers"
+        except Exception:
+            pass
+    return None
+
+
+def stabilize_vae(vae) -> str:
+    """
+    Avoid the fp16 VAE's NaN (black image) fallback: run the VAE in bf16
+    on GPUs with native bf16, casting the fp16 latents on entry; otherwise
+    decode in tiles. Returns "bf16" or "tiling".
+    """
+    if has_native_bf16():
+        vae.to(dtype=torch.bfloat16)
+        decode = vae.decode
+
+        def decode_bf16(z, *args, **kwargs):
+            return decode(z.to(torch.bfloat16), *args, **kwargs)
+
+        vae.decode = decode_bf16
+        return "bf16"
+    vae.enable_tiling()
+    return "tiling"
@@ -31,7 +31,7 @@ let
   # We dynamically build the python package set based on the backend
   pythonEnv = pkgs.python311.withPackages (ps: with ps; 
     # Common Deps
-    ([ pydantic requests numpy pillow omegaconf protobuf sentencepiece ]) ++
+    ([ pydantic requests numpy pillow omegaconf protobuf sentencepiece uvloop orjson ]) ++
     # Backend Specific Deps
     (if backend == "cuda" then [
        torch accelerate safetensors huggingface-hub 
@@ -1,87 +1,308 @@
 import gradio as gr
 import torch
 import os
+import copy
+import time
+import functools
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
 from diffusers import StableDiffusionPipeline
-from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig, pipeline
+from transformers import AutoModelForCausalLM, AutoTokenizer, GenerationConfig
+from transformers.generation.streamers import BaseStreamer
+
+from model_loading import (
+    attention_implementation, default_llm_model, enable_fused_attention, kv_cache_bytes, llm_dtype,
+    quantization_config_for, sd_pipeline_bytes, stabilize_vae, use_karras_scheduler
+)
 
 # --- Configuration ---
-SD_MODEL_ID = os.getenv("SD_MODEL_ID", "runwayml/stable-diffusion-v1-5")
-LLM_MODEL_ID = os.getenv("LLM_MODEL_ID", "mistralai/Mistral-7B-v0.1")
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 
+SD_MODEL_ID = os.getenv("SD_MODEL_ID", "runwayml/stable-diffusion-v1-5")
+LLM_MODEL_ID = os.getenv("LLM_MODEL_ID") or default_llm_model(DEVICE)
+# bf16 where native (CPU included); fp16 on older GPUs and for GPTQ/AWQ kernels
+LLM_DTYPE = llm_dtype(LLM_MODEL_ID, DEVICE, cpu_dtype=torch.bfloat16)
+# Compile the LLM forward with a static KV cache (CUDA graphs); slow first load
+LLM_COMPILE = os.getenv("LLM_COMPILE", "0") == "1" and DEVICE == "cuda"
+# Load both models in the background at startup instead of on first request
+WEBUI_PRELOAD = os.getenv("WEBUI_PRELOAD", "1") == "1"
+# Concurrent requests are batched into one model call (see MicroBatcher)
+SD_BATCH_MAX = int(os.getenv("WEBUI_SD_BATCH_MAX", "4"))
+LLM_BATCH_MAX = int(os.getenv("WEBUI_LLM_BATCH_MAX", "8"))
+BATCH_WINDOW = float(os.getenv("WEBUI_BATCH_WINDOW_MS", "20")) / 1000
+# VRAM kept free when sizing the LLM: per-image SD activations/VAE decode, and
+# the KV cache for a full LLM batch of prompt + up to 1000 new tokens each
+SD_IMAGE_VRAM_MB = int(os.getenv("WEBUI_SD_IMAGE_VRAM_MB", "1024"))
+LLM_KV_TOKENS = 2048
+
 print(f"Starting WebUI on {DEVICE}")
 print(f"SD Model: {SD_MODEL_ID}")
 print(f"LLM Model: {LLM_MODEL_ID}")
 
-# --- Lazy Loading Global Variables ---
+# --- Model Globals ---
+# Both models are preloaded at startup, SD then LLM, on one background thread.
+# The getters block on a per-model lock until that load finishes (or load
+# themselves if preloading is disabled); the Events make the loaded case lock-free.
 sd_pipe = None
 llm_pipeline = None
+llm_generation_config = None  # Built once at load; per-setting copies via generation_config_for()
+sd_ready = threading.Event()
+llm_ready = threading.Event()
+_sd_lock = threading.Lock()
+_llm_lock = threading.Lock()
 
 def get_sd_pipe():
     global sd_pipe
-    if sd_pipe is None:
-        print("Loading Stable Diffusion Model...")
-        dtype = torch.float16 if DEVICE == "cuda" else torch.float32
-        pipe = StableDiffusionPipeline.from_pretrained(
-            SD_MODEL_ID,
-            torch_dtype=dtype,
-            use_safetensors=True
-        )
-        pipe = pipe.to(DEVICE)
-        if DEVICE == "cuda":
-            pipe.enable_attention_slicing()
-        sd_pipe = pipe
+    if sd_ready.is_set():
+        return sd_pipe
+    with _sd_lock:
+        if sd_pipe is None:
+            print("Loading Stable Diffusion Model...")
+            dtype = torch.float16 if DEVICE == "cuda" else torch.float32
+            pipe = StableDiffusionPipeline.from_pretrained(
+                SD_MODEL_ID,
+                torch_dtype=dtype,
+                use_safetensors=True
+            )
+            use_karras_scheduler(pipe)
+            pipe = pipe.to(DEVICE)
+            if DEVICE == "cuda":
+                stabilize_vae(pipe.vae)
+            enable_fused_attention(pipe, DEVICE)
+            
+            # Warmup: cuDNN/cuBLAS autotuning happens here, not on the first user
+            with torch.inference_mode():
+                pipe("warmup", num_inference_steps=1)
+            
+            sd_pipe = pipe
+            sd_ready.set()
     return sd_pipe
 
+def llm_vram_reserve():
+    """
+    VRAM the LLM must leave free in this process: a full SD batch, a full
+    LLM batch's KV cache, and SD's weights if that pipeline is not loaded yet.
+    """
+    if DEVICE != "cuda":
+        return 0
+    reserve = SD_BATCH_MAX * SD_IMAGE_VRAM_MB * 1024 ** 2
+    reserve += kv_cache_bytes(LLM_MODEL_ID, LLM_BATCH_MAX, LLM_KV_TOKENS)
+    if not sd_ready.is_set():
+        reserve += sd_pipeline_bytes(SD_MODEL_ID)
+    return reserve
+
 def get_llm_pipeline():
-    global llm_pipeline
-    if llm_pipeline is None:
-        print("Loading LLM Model...")
-        quant_config = None
-        if DEVICE == "cuda":
-            quant_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_compute_dtype=torch.float16
+    global llm_pipeline, llm_generation_config
+    if llm_ready.is_set():
+        return llm_pipeline
+    with _llm_lock:
+        if llm_pipeline is None:
+            print("Loading LLM Model...")
+            quant_config = quantization_config_for(LLM_MODEL_ID, DEVICE, llm_vram_reserve())
+            
+            tokenizer = AutoTokenizer.from_pretrained(LLM_MODEL_ID, use_fast=True)
+            # Batched decode needs a pad token and left padding
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            tokenizer.padding_side = "left"
+            model = AutoModelForCausalLM.from_pretrained(
+                LLM_MODEL_ID,
+                quantization_config=quant_config,
+                device_map="auto" if DEVICE == "cuda" else None,
+                # Load straight into half precision (quantization_config_for sizes
+                # fp16 at 2 bytes/param), streaming shards without a full host-side copy
+                torch_dtype=LLM_DTYPE,
+                low_cpu_mem_usage=True,
+                attn_implementation=attention_implementation(DEVICE),
+                use_safetensors=True
             )
-        
-        tokenizer = AutoTokenizer.from_pretrained(LLM_MODEL_ID)
-        model = AutoModelForCausalLM.from_pretrained(
-            LLM_MODEL_ID,
-            quantization_config=quant_config,
-            device_map="auto" if DEVICE == "cuda" else None,
-            use_safetensors=True
-        )
-        
-        llm_pipeline = pipeline(
-            "text-generation",
-            model=model,
-            tokenizer=tokenizer
-        )
+            
+            llm_generation_config = GenerationConfig(
+                do_sample=True,
+                pad_token_id=tokenizer.pad_token_id,
+                eos_token_id=tokenizer.eos_token_id
+            )
+            
+            if LLM_COMPILE:
+                model.forward = torch.compile(model.forward, mode="reduce-overhead", fullgraph=True)
+                llm_generation_config.cache_implementation = "static"
+            
+            # Warmup (and graph capture when compiled) before the first user
+            print("Warming up LLM...")
+            warmup = tokenizer("warmup", return_tensors="pt").to(model.device)
+            with torch.inference_mode():
+                model.generate(**warmup, generation_config=generation_config_for(8 if LLM_COMPILE else 1, 1.0))
+            
+            # Tokenizer and model are used directly; no transformers.pipeline wrapper
+            llm_pipeline = (tokenizer, model)
+            llm_ready.set()
     return llm_pipeline
 
+@functools.lru_cache(maxsize=64)
+def generation_config_for(max_new_tokens, temperature):
+    """Sampling config for one slider setting, built once and reused by generate()."""
+    config = copy.deepcopy(llm_generation_config)
+    config.max_new_tokens = max_new_tokens
+    config.temperature = temperature
+    return config
+
+def _preload(*getters):
+    """
+    Load models in order on one thread. SD goes first so the LLM's fp16-vs-NF4
+    VRAM check sees the SD pipeline already resident.
+    """
+    for getter in getters:
+        try:
+            getter()
+        except Exception as e:
+            print(f"Preload failed ({getter.__name__}): {e}")
+
+# --- Micro-Batching ---
+
+class MicroBatcher:
+    """
+    Folds concurrent requests into one batched model call.
+    
+    Gradio runs handlers on worker threads; submit() blocks the caller until
+    its batch has run. Requests sharing a key (the generation settings) are
+    collected for up to `window` seconds or `max_batch` items, so several
+    users at once cost roughly one forward pass per step instead of several.
+    """
+    
+    def __init__(self, run_batch, max_batch, window):
+        self._run_batch = run_batch
+        self._max_batch = max_batch
+        self._window = window
+        self._queue = queue.Queue()
+        threading.Thread(target=self._loop, daemon=True).start()
+    
+    def submit(self, key, item):
+        return self.submit_nowait(key, item).result()
+    
+    def submit_nowait(self, key, item) -> Future:
+        future = Future()
+        self._queue.put((key, item, future))
+        return future
+    
+    def _loop(self):
+        deferred = deque()  # Requests seen while collecting a batch for another key
+        while True:
+            key, item, future = deferred.popleft() if deferred else self._queue.get()
+            batch = [(item, future)]
+            
+            for req in list(deferred):
+                if len(batch) >= self._max_batch:
+                    break
+                if req[0] == key:
+                    deferred.remove(req)
+                    batch.append(req[1:])
+            
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    req = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if req[0] == key:
+                    batch.append(req[1:])
+                else:
+                    deferred.append(req)
+            
+            try:
+                results = self._run_batch(key, [i for i, _ in batch])
+            except Exception as e:
+                for _, f in batch:
+                    f.set_exception(e)
+            else:
+                for (_, f), result in zip(batch, results):
+                    f.set_result(result)
+
+def _run_image_batch(key, prompts):
+    steps, guidance = key
+    pipe = get_sd_pipe()
+    try:
+        return pipe(prompts, num_inference_steps=steps, guidance_scale=guidance).images
+    except torch.cuda.OutOfMemoryError:
+        torch.cuda.empty_cache()
+        pipe.enable_attention_slicing()
+        return pipe(prompts, num_inference_steps=steps, guidance_scale=guidance).images
+
+class BatchTextStreamer(BaseStreamer):
+    """
+    Streams a batched generate() back to each requester.
+    
+    TextIteratorStreamer only handles batch size 1. This pushes each row's
+    decoded text so far onto that row's queue after every step. The first
+    put() is the prompt and is skipped; a row stops at its first EOS.
+    """
+    
+    def __init__(self, tokenizer, queues):
+        self.tokenizer = tokenizer
+        self.queues = queues
+        self.tokens = [[] for _ in queues]
+        self.done = [False] * len(queues)
+        self._prompt_seen = False
+    
+    def put(self, value):
+        if not self._prompt_seen:
+            self._prompt_seen = True
+            return
+        for row, token in enumerate(value.reshape(-1).tolist()):
+            if self.done[row]:
+                continue
+            if token == self.tokenizer.eos_token_id:
+                self.done[row] = True
+                continue
+            self.tokens[row].append(token)
+            self.queues[row].put(self.tokenizer.decode(self.tokens[row], skip_special_tokens=True))
+    
+    def end(self):
+        for q in self.queues:
+            q.put(None)
+
+def _run_text_batch(key, items):
+    max_length, temperature = key
+    queues = [q for _, q in items]
+    try:
+        tokenizer, model = get_llm_pipeline()
+        inputs = tokenizer([p for p, _ in items], return_tensors="pt", padding=True).to(model.device)
+        with torch.inference_mode():
+            model.generate(
+                **inputs,
+                generation_config=generation_config_for(max_length, temperature),
+                streamer=BatchTextStreamer(tokenizer, queues)
+            )
+    finally:
+        for q in queues:
+            q.put(None)  # Unblock readers even if generate() failed
+    return [None] * len(items)
+
+sd_batcher = MicroBatcher(_run_image_batch, SD_BATCH_MAX, BATCH_WINDOW)
+llm_batcher = MicroBatcher(_run_text_batch, LLM_BATCH_MAX, BATCH_WINDOW)
+
 # --- Generation Functions ---
 
 def generate_image(prompt, steps, guidance):
     try:
-        pipe = get_sd_pipe()
-        image = pipe(prompt, num_inference_steps=steps, guidance_scale=guidance).images[0]
-        return image
+        return sd_batcher.submit((int(steps), float(guidance)), prompt)
     except Exception as e:
         return None
 
 def generate_text(prompt, max_length, temperature):
+    # Generator handler: Gradio streams each yielded string into the textbox
+    stream = queue.Queue()
+    future = llm_batcher.submit_nowait((int(max_length), float(temperature)), (prompt, stream))
     try:
-        generator = get_llm_pipeline()
-        result = generator(
-            prompt, 
-            max_new_tokens=max_length,
-            do_sample=True,
-            temperature=temperature,
-            pad_token_id=generator.tokenizer.eos_token_id
-        )
-        return result[0]['generated_text']
+        while (text := stream.get()) is not None:
+            yield text
+        future.result()
     except Exception as e:
-        return f"Error: {str(e)}"
+        yield f"Error: {str(e)}"
 
 # --- Gradio Interface ---
 
@@ -92,13 +313,14 @@ with gr.Blocks(title="NixOS AI Inference Hub") as demo:
         with gr.Row():
             with gr.Column():
                 img_prompt = gr.Textbox(label="Prompt", placeholder="A cyberpunk city in rain...")
-                steps = gr.Slider(1, 100, value=25, label="Inference Steps")
+                steps = gr.Slider(1, 100, value=15, label="Inference Steps")
                 guidance = gr.Slider(1.0, 20.0, value=7.5, label="Guidance Scale")
                 img_btn = gr.Button("Generate Image", variant="primary")
             with gr.Column():
                 output_image = gr.Image(label="Generated Result")
         
-        img_btn.click(generate_image, inputs=[img_prompt, steps, guidance], outputs=output_image)
+        img_btn.click(generate_image, inputs=[img_prompt, steps, guidance], outputs=output_image,
+                      concurrency_limit=SD_BATCH_MAX)
 
     with gr.Tab("Text Generation"):
         with gr.Row():
@@ -110,7 +332,10 @@ with gr.Blocks(title="NixOS AI Inference Hub") as demo:
             with gr.Column():
                 output_text = gr.Textbox(label="Response", lines=10)
         
-        text_btn.click(generate_text, inputs=[text_prompt, max_len, temp], outputs=output_text)
+        text_btn.click(generate_text, inputs=[text_prompt, max_len, temp], outputs=output_text,
+                       concurrency_limit=LLM_BATCH_MAX)
 
 if __name__ == "__main__":
+    if WEBUI_PRELOAD:
+        threading.Thread(target=_preload, args=(get_sd_pipe, get_llm_pipeline), daemon=True).start()
     demo.launch(server_name="0.0.0.0", server_port=7860)
@@ -15,6 +15,9 @@ import os
 import sys
 import json
 import io
+import socket
+import selectors
+import functools
 from dataclasses import dataclass
 from typing import Optional, Dict, Any
 from pathlib import Path
@@ -52,11 +55,13 @@ DEVICE = detect_device()
 
 # Now import ML libraries (after device detection to set env vars properly)
 import torch
+from PIL import Image
 from dcf_common import (
     EventDrivenUDPSocket, DCFMessage, MessageType, ErrorCode,
     NodeMetrics, chunk_payload, setup_logging, validate_payload,
     DEFAULT_HEARTBEAT_INTERVAL
 )
+from model_loading import enable_fused_attention, stabilize_vae, use_karras_scheduler
 
 logger = setup_logging("WORKER")
 
@@ -71,8 +76,48 @@ HEARTBEAT_INTERVAL = float(os.getenv("DCF_HEARTBEAT_INTERVAL", str(DEFAULT_HEART
 
 # Model defaults
 DEFAULT_SD_MODEL = os.getenv("SD_MODEL_ID", "runwayml/stable-diffusion-v1-5")
-DEFAULT_INFERENCE_STEPS = int(os.getenv("SD_INFERENCE_STEPS", "25"))
+DEFAULT_INFERENCE_STEPS = int(os.getenv("SD_INFERENCE_STEPS", "15"))  # DPM-Solver++ Karras converges by ~15
 DEFAULT_GUIDANCE_SCALE = float(os.getenv("SD_GUIDANCE_SCALE", "7.5"))
+SD_COMPILE = os.getenv("SD_COMPILE", "1") == "1"  # torch.compile UNet/VAE on CUDA
+PROMPT_CACHE_SIZE = int(os.getenv("SD_PROMPT_CACHE", "256"))  # Cached CLIP embeddings
+# Converted (diffusers-format) copies of local single-file checkpoints
+WEIGHT_CACHE_DIR = Path(os.getenv("SD_WEIGHT_CACHE", Path.home() / ".cache" / "hydramesh" / "sd"))
+
+# TF32 matmul/conv on Ampere+, and let cuDNN autotune once for the fixed
+# worker image shape
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.backends.cudnn.allow_tf32 = True
+torch.backends.cudnn.benchmark = True
+
+# Result image encoding. WebP at method=0 encodes several times faster than
+# PNG deflate and is ~3x smaller, so results need far fewer UDP chunks.
+RESULT_SAVE_OPTIONS = {
+    "WEBP": {"quality": 90, "method": 0},
+    "PNG": {"optimize": True},
+    "JPEG": {"quality": 90},
+}
+
+
+def _check_result_format(name: str) -> str:
+    """
+    Return `name` if this Pillow build can encode it, else PNG.
+    
+    Checked once at startup so a typo or a Pillow without libwebp falls
+    back here, instead of failing every task after the GPU work is done.
+    """
+    Image.init()
+    if name in Image.SAVE:
+        try:
+            Image.new("RGB", (1, 1)).save(io.BytesIO(), format=name, **RESULT_SAVE_OPTIONS.get(name, {}))
+            return name
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"DCF_RESULT_FORMAT={name} failed to encode ({e}), using PNG")
+    else:
+        logger.warning(f"DCF_RESULT_FORMAT={name} is not supported by Pillow, using PNG")
+    return "PNG"
+
+
+RESULT_FORMAT = _check_result_format(os.getenv("DCF_RESULT_FORMAT", "WEBP").upper())
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -123,11 +168,12 @@ class StableDiffusionEngine(InferenceEngine):
         self.model_path = model_path or DEFAULT_SD_MODEL
         self.pipe = None
         self._dtype = torch.float16 if device == "cuda" else torch.float32
+        self._offloaded = False
+        # LRU of (prompt, cfg) -> text-encoder embeddings, so repeated prompts skip CLIP
+        self._encode_prompt = functools.lru_cache(maxsize=PROMPT_CACHE_SIZE)(self._encode_prompt_uncached)
         
     def load(self) -> bool:
         """Load the Stable Diffusion pipeline."""
-        from diffusers import StableDiffusionPipeline, DPMSolverMultistepScheduler
-        
         try:
             logger.info(f"Loading model: {self.model_path}")
             logger.info(f"Device: {self.device} | Dtype: {self._dtype}")
@@ -138,14 +184,18 @@ class StableDiffusionEngine(InferenceEngine):
             else:
                 self.pipe = self._load_from_hub()
             
-            # Optimize scheduler
-            self.pipe.scheduler = DPMSolverMultistepScheduler.from_config(
-                self.pipe.scheduler.config
-            )
+            # Move weights to the device (or set up offload if VRAM-bound)
+            self._place_on_device()
+            
+            use_karras_scheduler(self.pipe)
             
             # Apply optimizations
             self._apply_optimizations()
             
+            # Warmup: trigger compilation, autotuning and graph capture before serving
+            logger.info("Warming up pipeline...")
+            self._generate("warmup", 1, DEFAULT_GUIDANCE_SCALE)
+            
             self.model_loaded = True
             logger.info("✓ Model loaded successfully")
             return True
@@ -160,9 +210,22 @@ class StableDiffusionEngine(InferenceEngine):
         return path.exists() and path.suffix in ('.safetensors', '.ckpt', '.bin')
     
     def _load_from_file(self):
-        """Load from local safetensors file."""
+        """
+        Load from a local single-file checkpoint.
+        
+        Single-file checkpoints use original LDM key names and need
+        diffusers' conversion on every load. The first load saves the
+        converted pipeline to WEIGHT_CACHE_DIR; later starts read that copy,
+        streaming the UNet straight to the device.
+        """
         from diffusers import StableDiffusionPipeline
         
+        stat = Path(self.model_path).stat()
+        cache_dir = WEIGHT_CACHE_DIR / f"{Path(self.model_path).stem}-{stat.st_size}-{stat.st_mtime_ns}"
+        if (cache_dir / "model_index.json").exists():
+            logger.info(f"Loading from weight cache: {cache_dir}")
+            return self._load_from_cache(cache_dir)
+        
         logger.info(f"Loading from local file: {self.model_path}")
         pipe = StableDiffusionPipeline.from_single_file(
             self.model_path,
@@ -170,7 +233,40 @@ class StableDiffusionEngine(InferenceEngine):
             use_safetensors=True,
             load_safety_checker=False
         )
-        return pipe.to(self.device)
+        
+        try:
+            pipe.save_pretrained(cache_dir, safe_serialization=True)
+            logger.info(f"Saved converted weights to {cache_dir}")
+        except OSError as e:
+            logger.warning(f"Could not write weight cache ({e}), continuing")
+        return pipe
+    
+    def _load_from_cache(self, cache_dir: Path):
+        """
+        Build the pipeline from a converted cache, loading the UNet with
+        safe_open(device=...) so its tensors are mmap'd and copied directly
+        to the device instead of materializing in host memory first.
+        """
+        from accelerate import init_empty_weights
+        from diffusers import StableDiffusionPipeline, UNet2DConditionModel
+        from safetensors import safe_open
+        
+        unet_config = UNet2DConditionModel.load_config(cache_dir, subfolder="unet")
+        with init_empty_weights():
+            unet = UNet2DConditionModel.from_config(unet_config)
+        
+        weights = cache_dir / "unet" / "diffusion_pytorch_model.safetensors"
+        with safe_open(weights, framework="pt", device=self.device) as f:
+            state = {k: f.get_tensor(k).to(self._dtype) for k in f.keys()}
+        unet.load_state_dict(state, assign=True)
+        
+        return StableDiffusionPipeline.from_pretrained(
+            cache_dir,
+            unet=unet,
+            torch_dtype=self._dtype,
+            safety_checker=None,
+            requires_safety_checker=False
+        )
     
     def _load_from_hub(self):
         """Load from HuggingFace Hub."""
@@ -184,29 +280,79 @@ class StableDiffusionEngine(InferenceEngine):
             safety_checker=None,
             requires_safety_checker=False
         )
-        return pipe.to(self.device)
+        return pipe
+    
+    def _place_on_device(self):
+        """
+        Keep the pipeline resident on the GPU when it fits.
+        
+        Otherwise prefer whole-component offload (one transfer per component
+        per call), then stream-overlapped group offload, and only as a last
+        resort per-submodule sequential offload.
+        """
+        if self.device != "cuda":
+            self.pipe.to(self.device)
+            return
+        
+        modules = [m for m in self.pipe.components.values() if isinstance(m, torch.nn.Module)]
+        sizes = [sum(p.numel() * p.element_size() for p in m.parameters()) for m in modules]
+        # Weights already on the GPU (the UNet, when streamed from the weight
+        # cache) are counted in sizes, so add them back to the free budget
+        resident = sum(p.numel() * p.element_size()
+                       for m in modules for p in m.parameters() if p.device.type == "cuda")
+        free = torch.cuda.mem_get_info()[0] + resident
+        gib = 1024 ** 3
+        
+        if free > sum(sizes) * 1.2:
+            self.pipe.to(self.device)
+            return
+        
+        self._offloaded = True
+        if free > max(sizes) * 1.2:
+            logger.info(f"VRAM-bound ({free / gib:.1f}GB free, model {sum(sizes) / gib:.1f}GB), "
+                        f"enabling model CPU offload")
+            self.pipe.enable_model_cpu_offload()
+            return
+        
+        try:
+            from diffusers.hooks import apply_group_offloading
+        except ImportError:
+            logger.info(f"Low VRAM ({free / gib:.1f}GB free), enabling sequential CPU offload")
+            self.pipe.enable_sequential_cpu_offload()
+            return
+        
+        # Prefetch the next layer's weights on a copy stream while the current one runs
+        logger.info(f"Low VRAM ({free / gib:.1f}GB free), enabling streamed group offload")
+        for module in modules:
+            apply_group_offloading(
+                module,
+                onload_device=torch.device(self.device),
+                offload_type="leaf_level",
+                use_stream=True
+            )
     
     def _apply_optimizations(self):
         """Apply device-specific optimizations."""
+        attention = enable_fused_attention(self.pipe, self.device)
+        if attention:
+            logger.info(f"✓ {attention} attention enabled")
+        
         if self.device == "cuda":
-            # Memory optimizations for GPU
-            self.pipe.enable_attention_slicing()
-            
-            # Enable CPU offload for large models on limited VRAM
-            vram_gb = torch.cuda.get_device_properties(0).total_memory / (1024**3)
-            if vram_gb < 8:
-                logger.info(f"Low VRAM ({vram_gb:.1f}GB), enabling CPU offload")
-                self.pipe.enable_sequential_cpu_offload()
+            logger.info(f"✓ VAE: {stabilize_vae(self.pipe.vae)}")
             
-            # Try xformers if available
-            try:
-                self.pipe.enable_xformers_memory_efficient_attention()
-                logger.info("✓ xformers enabled")
-            except Exception:
-                pass
+            # NHWC: cuDNN's Tensor Core conv kernels prefer channels-last
+            self.pipe.unet.to(memory_format=torch.channels_last)
+            self.pipe.vae.to(memory_format=torch.channels_last)
+        
+        # Fixed shapes on every call suit shape-specialized codegen and CUDA
+        # graphs. Offload hooks move weights mid-forward, so compile only when resident.
+        if self.device == "cuda" and SD_COMPILE and not self._offloaded:
+            self.pipe.unet = torch.compile(self.pipe.unet, mode="reduce-overhead", fullgraph=True)
+            self.pipe.vae.decode = torch.compile(self.pipe.vae.decode)
+            logger.info("✓ UNet/VAE compiled")
     
     def run(self, prompt: str, **kwargs) -> bytes:
-        """Generate image from prompt. Returns PNG bytes."""
+        """Generate image from prompt. Returns image bytes in RESULT_FORMAT."""
         if not self.model_loaded:
             raise RuntimeError("Model not loaded")
         
@@ -214,22 +360,49 @@ class StableDiffusionEngine(InferenceEngine):
         guidance = kwargs.get('guidance', DEFAULT_GUIDANCE_SCALE)
         
         with self._lock:
-            with torch.inference_mode():
-                result = self.pipe(
-                    prompt,
-                    num_inference_steps=steps,
-                    guidance_scale=guidance
-                )
-                image = result.images[0]
-        
-        # Convert to PNG bytes
+            try:
+                image = self._generate(prompt, steps, guidance)
+            except torch.cuda.OutOfMemoryError:
+                # Trade speed for memory from now on and retry once
+                logger.warning("CUDA OOM, falling back to attention slicing")
+                torch.cuda.empty_cache()
+                self.pipe.enable_attention_slicing()
+                image = self._generate(prompt, steps, guidance)
+        
+        # Encode result
         buffer = io.BytesIO()
-        image.save(buffer, format='PNG', optimize=True)
+        image.save(buffer, format=RESULT_FORMAT, **RESULT_SAVE_OPTIONS.get(RESULT_FORMAT, {}))
         return buffer.getvalue()
     
+    def _encode_prompt_uncached(self, prompt: str, do_cfg: bool):
+        return self.pipe.encode_prompt(
+            prompt,
+            self.pipe._execution_device,
+            1,
+            do_cfg,
+            negative_prompt=""
+        )
+    
+    def _generate(self, prompt: str, steps: int, guidance: float):
+        with torch.inference_mode():
+            prompt_embeds, negative_prompt_embeds = self._encode_prompt(prompt, guidance > 1.0)
+            result = self.pipe(
+                prompt_embeds=prompt_embeds,
+                negative_prompt_embeds=negative_prompt_embeds,
+                num_inference_steps=steps,
+                guidance_scale=guidance,
+                output_type="pt"
+            )
+            # "pt" output is (B, 3, H, W) in [0, 1] on the device: quantize to
+            # uint8 HWC there so only one small tensor crosses to the host
+            pixels = result.images[0].mul(255).round_().clamp_(0, 255).to(torch.uint8)
+            pixels = pixels.permute(1, 2, 0).contiguous().cpu().numpy()
+        return Image.fromarray(pixels)
+    
     def unload(self):
         """Free GPU memory."""
         if self.pipe is not None:
+            self._encode_prompt.cache_clear()
             del self.pipe
             self.pipe = None
             if self.device == "cuda":
@@ -346,8 +519,13 @@ class WorkerNode:
         # Initialize engine
         self.engine = StableDiffusionEngine(model_path=model_path, device=DEVICE)
         
-        # Network
+        # Network. The main loop sleeps in the selector until a datagram
+        # arrives; shutdown() writes to the wake pair to interrupt it.
         self.sock = EventDrivenUDPSocket(LISTEN_PORT)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.sock.fileno(), selectors.EVENT_READ)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
         
         # State
         self._shutdown = threading.Event()
@@ -388,6 +566,10 @@ class WorkerNode:
         """Graceful shutdown."""
         logger.info("Initiating shutdown...")
         self._shutdown.set()
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
         self.engine.unload()
         self.sock.close()
         logger.info("Shutdown complete")
@@ -407,10 +589,13 @@ class WorkerNode:
     
     def _heartbeat_loop(self):
         """Send periodic heartbeats to head."""
+        # Payload never changes: build the message once and only restamp it
+        msg = DCFMessage.heartbeat(0, LISTEN_PORT)
         while not self._shutdown.is_set():
             try:
                 self._sequence += 1
-                msg = DCFMessage.heartbeat(self._sequence, LISTEN_PORT)
+                msg.sequence = self._sequence
+                msg.timestamp = DCFMessage.current_timestamp_micros()
                 self.sock.send(msg, self.head_addr)
                 self.metrics.messages_sent += 1
             except Exception as e:
@@ -423,24 +608,29 @@ class WorkerNode:
                 time.sleep(0.1)
     
     def _run(self):
-        """Main event loop."""
-        while not self._shutdown.is_set():
-            result = self.sock.recv(timeout=0.1)
-            if result:
-                msg, addr = result
-                self.metrics.messages_received += 1
-                self.metrics.bytes_received += len(msg.payload)
-                
-                if msg.msg_type == MessageType.TASK:
-                    self._handle_task(msg)
-                elif msg.msg_type == MessageType.SHUTDOWN:
-                    logger.info("Received shutdown signal from head")
-                    self.shutdown()
+        """Main event loop: block in the kernel until readable, then drain a batch."""
+        try:
+            while not self._shutdown.is_set():
+                self._selector.select()
+                for msg, addr in self.sock.recv_batch():
+                    self.metrics.messages_received += 1
+                    self.metrics.bytes_received += len(msg.payload)
+                    
+                    if msg.msg_type == MessageType.TASK:
+                        self._handle_task(msg)
+                    elif msg.msg_type == MessageType.SHUTDOWN:
+                        logger.info("Received shutdown signal from head")
+                        self.shutdown()
+                        break
+        finally:
+            self._selector.close()
+            self._wake_r.close()
+            self._wake_w.close()
     
     def _handle_task(self, msg: DCFMessage):
         """Process an inference task."""
         self._busy = True
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
         
         logger.info(f"← Task {msg.sequence} received ({len(msg.payload)} bytes)")
         
@@ -464,7 +654,7 @@ class WorkerNode:
                 guidance=task_data.get('guidance', DEFAULT_GUIDANCE_SCALE)
             )
             
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.monotonic_ns() - start_ns) / 1_000_000
             
             # Send result (chunked if necessary)
             self._send_result(msg.sequence, result_bytes)
@@ -502,6 +692,8 @@ class WorkerNode:
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def main():
+    global LISTEN_PORT
+    
     parser = argparse.ArgumentParser(
         description="HydraMesh Worker Node - GPU/CPU Inference Worker",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -520,8 +712,12 @@ Environment Variables:
   TORCH_DEVICE          Force device (cuda/cpu)
   HF_TOKEN              HuggingFace token for gated models
   SD_MODEL_ID           Default model ID
-  SD_INFERENCE_STEPS    Default inference steps
+  SD_INFERENCE_STEPS    Default inference steps (default: 15)
   SD_GUIDANCE_SCALE     Default CFG scale
+  SD_COMPILE            torch.compile UNet/VAE on CUDA (default: 1)
+  SD_WEIGHT_CACHE       Converted single-file checkpoint cache (default: ~/.cache/hydramesh/sd)
+  SD_PROMPT_CACHE       Prompt embeddings kept in the LRU cache (default: 256)
+  DCF_RESULT_FORMAT     Result image format: WEBP, PNG or JPEG (default: WEBP)
         """
     )
     
@@ -551,7 +747,6 @@ Environment Variables:
     args = parser.parse_args()
     
     # Update global port if specified
-    global LISTEN_PORT
     LISTEN_PORT = args.port
     
     worker = WorkerNode(